@@ -6,17 +6,37 @@ usando Retrieval-Augmented Generation (RAG) com ChromaDB.
 
 Arquitetura:
 - Vector Store: ChromaDB
-- Embeddings: ChromaDB default (all-MiniLM-L6-v2)
+- Embeddings: all-MiniLM-L6-v2 em ONNX (padrão do ChromaDB ou quantizado em int8)
 - LLM: Groq (Llama 3.1 70B ou modelo configurado)
 - Retrieval: Top-k similarity search
 """
 
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
 import config
-from utils.document_loader import load_compliance_policy, split_text_for_rag
-from utils.llm_adapter import LLMAdapter
+from utils.document_loader import load_policy_chunks
+from utils.embeddings import get_embedder, get_embedder_id
+from utils.llm_adapter import LLMAdapter, get_adapter
+from utils.semantic_cache import SemanticCache
+
+# Tamanho máximo de cada lote enviado ao ChromaDB em collection.add()
+ADD_BATCH_SIZE = 1000
+
+# System prompt otimizado para Groq/Llama
+COMPLIANCE_SYSTEM_PROMPT = """Você é um assistente especializado em compliance da Dunder Mifflin.
+Sua função é ajudar funcionários a entender e seguir as políticas de compliance da empresa.
+
+REGRAS IMPORTANTES:
+1. Responda APENAS com base no contexto fornecido da política de compliance
+2. Se a informação não estiver no contexto, diga explicitamente que não encontrou
+3. Seja preciso e cite seções específicas quando relevante (ex: "De acordo com a Seção 1.1...")
+4. Use um tom profissional mas acessível e direto
+5. Se houver valores monetários ou prazos, cite-os exatamente como aparecem na política
+6. Sempre que possível, explique PORQUÊ a regra existe (contexto/motivação)
+7. Seja conciso mas completo - não invente informações além do contexto fornecido"""
+
+NOT_FOUND_MESSAGE = "Desculpe, não encontrei informações relevantes na política de compliance para responder sua pergunta."
 
 
 class ComplianceRAGAgent:
@@ -25,99 +45,156 @@ class ComplianceRAGAgent:
     Compatível com múltiplos provedores de LLM via LLMAdapter
     """
     
-    def __init__(self):
-        # Usar adaptador universal de LLM
-        self.llm = LLMAdapter()
+    def __init__(self, llm: Optional[LLMAdapter] = None):
+        # Usar adaptador universal de LLM (compartilhado, se fornecido)
+        self.llm = llm or get_adapter()
         
-        # Inicializar ChromaDB
-        self.chroma_client = chromadb.PersistentClient(
-            path=str(config.CHROMA_PERSIST_DIR)
-        )
+        # Embedder único (ONNX all-MiniLM-L6-v2), reaproveitado na indexação e nas consultas
+        self._embedder = get_embedder()
+        self._embedder_id = get_embedder_id()
+        
+        # Respostas de perguntas parecidas (opcional, por sessão)
+        self.semantic_cache = SemanticCache(config.RAG_SEMANTIC_CACHE_THRESHOLD) \
+            if config.RAG_SEMANTIC_CACHE_THRESHOLD > 0 else None
+        
+        # Inicializar ChromaDB (servidor dedicado, se configurado, ou embutido no processo)
+        if config.CHROMA_HOST:
+            self.chroma_client = chromadb.HttpClient(
+                host=config.CHROMA_HOST,
+                port=config.CHROMA_PORT
+            )
+        else:
+            self.chroma_client = chromadb.PersistentClient(
+                path=str(config.CHROMA_PERSIST_DIR)
+            )
         
         # Tentar obter coleção existente ou criar nova
         try:
-            self.collection = self.chroma_client.get_collection(
-                name=config.COLLECTION_NAME
-            )
-            print("✓ Coleção ChromaDB carregada")
+            self.collection = self.chroma_client.get_collection(name=config.COLLECTION_NAME)
         except:
+            self.collection = None
+        
+        # Vetores de embedders diferentes (ex: FP32 vs int8) não são comparáveis:
+        # se o embedder configurado mudou, a coleção é reindexada
+        if self.collection is not None and \
+                (self.collection.metadata or {}).get("embedder") != self._embedder_id:
+            print("Embedder alterado, reindexando coleção ChromaDB...")
+            self.chroma_client.delete_collection(name=config.COLLECTION_NAME)
+            self.collection = None
+        
+        if self.collection is not None:
+            print("✓ Coleção ChromaDB carregada")
+        else:
             print("Criando nova coleção ChromaDB...")
             self._initialize_vector_store()
     
     def _initialize_vector_store(self):
         """Inicializa o vector store com a política de compliance"""
-        # Carregar política
-        policy_text = load_compliance_policy(str(config.COMPLIANCE_POLICY_PATH))
-        
-        # Dividir em chunks
-        chunks = split_text_for_rag(policy_text, chunk_size=800, chunk_overlap=150)
+        # Carregar política já dividida em chunks
+        chunks = load_policy_chunks(str(config.COMPLIANCE_POLICY_PATH), chunk_size=800, chunk_overlap=150)
         
-        # Criar coleção
-        # ChromaDB usa embeddings padrão (all-MiniLM-L6-v2) automaticamente
+        # Criar coleção (embeddings sempre calculados por self._embedder e passados
+        # explicitamente; distância L2, na mesma escala de config.RAG_MAX_DISTANCE)
         self.collection = self.chroma_client.create_collection(
             name=config.COLLECTION_NAME,
-            metadata={"description": "Dunder Mifflin Compliance Policy"}
+            metadata={
+                "description": "Dunder Mifflin Compliance Policy",
+                "embedder": self._embedder_id,
+                "hnsw:space": "l2"
+            }
         )
         
-        # Adicionar chunks ao vector store
-        for i, chunk in enumerate(chunks):
+        # Calcular embeddings de todos os chunks de uma vez, fora do loop de inserção
+        embeddings = self._embed_chunks(chunks)
+        
+        # Adicionar chunks ao vector store em lotes (uma chamada .add() por lote)
+        ids = [f"chunk_{i}" for i in range(len(chunks))]
+        metadatas = [
+            {"chunk_id": i, "source": "politica_compliance.txt"}
+            for i in range(len(chunks))
+        ]
+
+        for start in range(0, len(chunks), ADD_BATCH_SIZE):
+            end = start + ADD_BATCH_SIZE
             self.collection.add(
-                documents=[chunk],
-                ids=[f"chunk_{i}"],
-                metadatas=[{"chunk_id": i, "source": "politica_compliance.txt"}]
+                embeddings=embeddings[start:end],
+                documents=chunks[start:end],
+                ids=ids[start:end],
+                metadatas=metadatas[start:end]
             )
-        
+
         print(f"✓ Vector store inicializado com {len(chunks)} chunks")
     
-    def _retrieve_relevant_chunks(self, query: str, n_results: int = 4) -> List[str]:
+    def _embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings para uma lista de chunks em uma única chamada ao embedder
+        
+        Args:
+            chunks: Textos a serem vetorizados
+            
+        Returns:
+            Lista de vetores (um por chunk)
+        """
+        return [vector.tolist() for vector in self._embedder(chunks)]
+    
+    def _retrieve_relevant_chunks(self, query: str, n_results: int = 4,
+                                  query_embedding: Optional[List[float]] = None) -> List[str]:
         """
         Recupera chunks relevantes para a query
         
         Args:
             query: Pergunta do usuário
             n_results: Número de chunks a retornar (padrão: 4)
+            query_embedding: Embedding da pergunta, se já calculado
             
         Returns:
-            Lista de chunks relevantes
+            Lista de chunks relevantes (vazia se nenhum estiver abaixo de
+            config.RAG_MAX_DISTANCE)
         """
+        # Mesmo embedder da indexação, chamado diretamente (sem o caminho query_texts)
+        if query_embedding is None:
+            query_embedding = self._embed_chunks([query])[0]
+        
         results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            include=["documents", "distances"]
         )
         
-        return results['documents'][0] if results['documents'] else []
+        if not results['documents'] or not results['documents'][0]:
+            return []
+        
+        # Se nem o chunk mais próximo é similar o bastante, não há contexto útil
+        # (evita uma chamada ao LLM para responder com base em trechos irrelevantes)
+        distances = results['distances'][0]
+        if config.RAG_MAX_DISTANCE > 0 and min(distances) > config.RAG_MAX_DISTANCE:
+            return []
+        
+        return results['documents'][0]
     
-    def query(self, user_question: str) -> str:
+    def _build_prompts(self, user_question: str,
+                       query_embedding: Optional[List[float]] = None) -> Optional[Tuple[str, str]]:
         """
-        Responde pergunta do usuário usando RAG
+        Monta os prompts (system, user) com o contexto recuperado da política
         
         Args:
             user_question: Pergunta do funcionário
+            query_embedding: Embedding da pergunta, se já calculado
             
         Returns:
-            Resposta fundamentada na política de compliance
+            Tupla (system_prompt, user_prompt) ou None se nada relevante foi encontrado
         """
         # Recuperar chunks relevantes
-        relevant_chunks = self._retrieve_relevant_chunks(user_question, n_results=4)
+        relevant_chunks = self._retrieve_relevant_chunks(user_question, n_results=4,
+                                                         query_embedding=query_embedding)
         
         if not relevant_chunks:
-            return "Desculpe, não encontrei informações relevantes na política de compliance para responder sua pergunta."
+            return None
         
         # Construir contexto
         context = "\n\n---\n\n".join(relevant_chunks)
         
-        # System prompt otimizado para Groq/Llama
-        system_prompt = """Você é um assistente especializado em compliance da Dunder Mifflin.
-Sua função é ajudar funcionários a entender e seguir as políticas de compliance da empresa.
-
-REGRAS IMPORTANTES:
-1. Responda APENAS com base no contexto fornecido da política de compliance
-2. Se a informação não estiver no contexto, diga explicitamente que não encontrou
-3. Seja preciso e cite seções específicas quando relevante (ex: "De acordo com a Seção 1.1...")
-4. Use um tom profissional mas acessível e direto
-5. Se houver valores monetários ou prazos, cite-os exatamente como aparecem na política
-6. Sempre que possível, explique PORQUÊ a regra existe (contexto/motivação)
-7. Seja conciso mas completo - não invente informações além do contexto fornecido"""
+        system_prompt = COMPLIANCE_SYSTEM_PROMPT
 
         user_prompt = f"""CONTEXTO DA POLÍTICA DE COMPLIANCE:
 {context}
@@ -127,14 +204,86 @@ PERGUNTA DO FUNCIONÁRIO:
 
 Por favor, responda à pergunta com base apenas nas informações do contexto acima. Seja direto e preciso."""
 
+        return system_prompt, user_prompt
+    
+    def query(self, user_question: str) -> str:
+        """
+        Responde pergunta do usuário usando RAG
+        
+        Args:
+            user_question: Pergunta do funcionário
+            
+        Returns:
+            Resposta fundamentada na política de compliance
+        """
+        # Embedding da pergunta calculado uma vez: serve ao cache semântico e à recuperação
+        query_embedding = self._embed_chunks([user_question])[0]
+        
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(query_embedding)
+            if cached is not None:
+                return cached
+        
+        prompts = self._build_prompts(user_question, query_embedding)
+        
+        if prompts is None:
+            return NOT_FOUND_MESSAGE
+        
+        system_prompt, user_prompt = prompts
+        
         # Usar adaptador LLM (funciona com Groq)
         answer = self.llm.generate(
             system_prompt=system_prompt,
             user_prompt=user_prompt
         )
         
+        if self.semantic_cache is not None:
+            self.semantic_cache.set(query_embedding, answer)
+        
         return answer
     
+    def query_stream(self, user_question: str) -> Iterator[str]:
+        """
+        Responde pergunta do usuário usando RAG, entregando a resposta em pedaços
+        
+        Args:
+            user_question: Pergunta do funcionário
+            
+        Returns:
+            Iterador com os pedaços da resposta à medida que são gerados
+        """
+        query_embedding = self._embed_chunks([user_question])[0]
+        
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(query_embedding)
+            if cached is not None:
+                return iter([cached])
+        
+        prompts = self._build_prompts(user_question, query_embedding)
+        
+        if prompts is None:
+            return iter([NOT_FOUND_MESSAGE])
+        
+        system_prompt, user_prompt = prompts
+        
+        chunks = self.llm.generate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            stream=True
+        )
+        
+        if self.semantic_cache is None:
+            return chunks
+        return self._cache_stream(query_embedding, chunks)
+    
+    def _cache_stream(self, query_embedding: List[float], chunks: Iterator[str]) -> Iterator[str]:
+        """Repassa os pedaços da resposta e guarda o texto completo no cache semântico ao final"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.semantic_cache.set(query_embedding, "".join(parts))
+    
     def reset_vector_store(self):
         """Reseta o vector store (útil para testes)"""
         try:
@@ -194,10 +343,14 @@ def main():
         if question:
             import time
             start_time = time.time()
-            answer = agent.query(question)
-            elapsed = time.time() - start_time
             
-            print(f"\n💡 Resposta: {answer}")
+            # Exibir a resposta à medida que os tokens chegam
+            print("\n💡 Resposta: ", end="", flush=True)
+            for chunk in agent.query_stream(question):
+                print(chunk, end="", flush=True)
+            print()
+            
+            elapsed = time.time() - start_time
             print(f"⏱️  Tempo: {elapsed:.2f}s\n")
             print("-" * 80)
 
@@ -10,12 +10,79 @@ Arquitetura:
 - LLM: Groq (Llama 3.1 70B ou modelo configurado) com prompt especializado
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import config
 from utils.document_loader import load_emails, format_email_for_analysis
-from utils.llm_adapter import LLMAdapter
-import json
+from utils.llm_adapter import LLMAdapter, get_adapter
+from utils.lexical_triage import LexicalTriage, train_lexical_triage
+import heapq
+import orjson
+import pickle
+import re
+import sys
 import time
+from concurrent.futures import as_completed
+from utils.concurrency import ContextThreadPoolExecutor
+
+# Termos da triagem de emails relevantes (comparados com os campos em minúsculas
+# pré-calculados por load_emails)
+MICHAEL_ADDRESS = "michael.scott@dundermifflin.com"
+TOBY_MENTION_RE = re.compile(r"toby|flenderson")
+
+# Critérios de análise compartilhados pelos prompts individual e em lote
+CONSPIRACY_RUBRIC = """Você é um investigador de comportamento corporativo especializado em detectar conspiração e hostilidade.
+
+MISSÃO: Detectar se Michael Scott está conspirando contra Toby Flenderson (representante de RH).
+
+PADRÕES DE CONSPIRAÇÃO:
+1. Comentários depreciativos sobre Toby
+2. Minar a autoridade de Toby
+3. Piadas ou sarcasmo dirigido a Toby
+4. Ignorar procedimentos de RH de Toby
+5. Coordenação com outros contra Toby
+6. Fazer Toby parecer incompetente
+7. Hostilidade velada ou explícita
+
+ESCALA DE SEVERIDADE:
+- 0-3: Normal (sem conspiração)
+- 4-6: Leve (piadas, ignorar menor)
+- 7-8: Moderado (desrespeito claro)
+- 9-10: Alto (conspiração ativa, hostilidade explícita)"""
+
+# System prompts completos (rubrica + formato de resposta)
+SINGLE_EMAIL_SYSTEM_PROMPT = CONSPIRACY_RUBRIC + """
+
+FORMATO DE RESPOSTA (JSON estrito):
+{
+    "is_suspicious": true,
+    "severity": 8,
+    "reasoning": "explicação concisa e direta",
+    "evidence_quotes": ["citação 1", "citação 2"]
+}
+
+IMPORTANTE: Responda APENAS com JSON válido, sem texto adicional."""
+
+BATCH_SYSTEM_PROMPT = CONSPIRACY_RUBRIC + """
+
+Você receberá vários emails numerados ([EMAIL 1], [EMAIL 2], ...). Analise CADA email separadamente.
+
+FORMATO DE RESPOSTA (JSON estrito, um objeto por email, na mesma ordem):
+{
+    "results": [
+        {
+            "email": 1,
+            "is_suspicious": true,
+            "severity": 8,
+            "reasoning": "explicação concisa e direta",
+            "evidence_quotes": ["citação 1", "citação 2"]
+        }
+    ]
+}
+
+IMPORTANTE: Responda APENAS com JSON válido, sem texto adicional."""
+
+# Tokens de saída reservados por email em uma chamada em lote
+BATCH_TOKENS_PER_EMAIL = 300
 
 
 class ConspiracyDetectionAgent:
@@ -24,9 +91,18 @@ class ConspiracyDetectionAgent:
     Compatível com múltiplos provedores de LLM via LLMAdapter
     """
     
-    def __init__(self):
-        # Usar adaptador universal de LLM
-        self.llm = LLMAdapter()
+    def __init__(self, llm: Optional[LLMAdapter] = None):
+        # Usar adaptador universal de LLM (compartilhado, se fornecido)
+        self.llm = llm or get_adapter()
+        
+        # Triagem lexical opcional: descarta emails claramente benignos antes do LLM
+        self.triage = None
+        if config.CONSPIRACY_TRIAGE_MODEL_PATH:
+            try:
+                self.triage = LexicalTriage.load(config.CONSPIRACY_TRIAGE_MODEL_PATH)
+            except (OSError, ImportError, EOFError, pickle.UnpicklingError, AttributeError) as e:
+                # Modelo ausente, truncado, corrompido ou salvo com outra versão do sklearn
+                print(f"⚠️  {e} - triagem lexical desativada")
     
     def analyze_emails(self) -> Dict:
         """
@@ -43,21 +119,42 @@ class ConspiracyDetectionAgent:
         relevant_emails = self._filter_relevant_emails(emails)
         print(f"✓ {len(relevant_emails)} emails relevantes identificados")
         
-        # Analisar cada email suspeito
-        print(f"\n🔍 Analisando {len(relevant_emails)} emails relevantes...")
-        suspicious_emails = []
+        # Triagem lexical: emails claramente benignos já recebem análise sem chamar o LLM
+        analyses = self._triage_emails(relevant_emails)
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
         
-        for i, email in enumerate(relevant_emails, 1):
-            # Mostrar progresso
-            if i % 10 == 0 or i == len(relevant_emails):
-                print(f"  Progresso: {i}/{len(relevant_emails)} emails analisados...")
+        # Analisar os emails restantes com o LLM
+        print(f"\n🔍 Analisando {len(pending)} emails relevantes...")
+        completed = 0
+        
+        # Agrupar emails em lotes (uma chamada ao LLM por lote)
+        batch_size = max(1, config.CONSPIRACY_BATCH_SIZE)
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        
+        # Chamadas ao LLM são limitadas por rede: analisar lotes em paralelo
+        with ContextThreadPoolExecutor(max_workers=config.LLM_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(self._analyze_email_batch, [relevant_emails[i] for i in batch]): batch
+                for batch in batches
+            }
             
-            analysis = self._analyze_single_email(email)
-            if analysis['is_suspicious']:
-                suspicious_emails.append({
-                    'email': email,
-                    'analysis': analysis
-                })
+            for future in as_completed(futures):
+                batch = futures[future]
+                for i, analysis in zip(batch, future.result()):
+                    analyses[i] = analysis
+                
+                # Mostrar progresso (as_completed roda na thread principal)
+                previous = completed
+                completed += len(batch)
+                if completed // 10 > previous // 10 or completed == len(pending):
+                    print(f"  Progresso: {completed}/{len(pending)} emails analisados...")
+        
+        # Manter a ordem original dos emails no resultado
+        suspicious_emails = [
+            {'email': email, 'analysis': analysis}
+            for email, analysis in zip(relevant_emails, analyses)
+            if analysis['is_suspicious']
+        ]
         
         print(f"✓ Análise completa: {len(suspicious_emails)} emails suspeitos detectados")
         
@@ -76,19 +173,137 @@ class ConspiracyDetectionAgent:
         relevant = []
         
         for email in emails:
-            # Email de ou para Michael Scott
-            if 'michael.scott@dundermifflin.com' in email['de'].lower() or \
-               'michael.scott@dundermifflin.com' in email['para'].lower():
+            # Email de ou para Michael Scott (endereços já normalizados em load_emails)
+            if email['_de_lc'] == MICHAEL_ADDRESS or MICHAEL_ADDRESS in email['_para_lc']:
                 relevant.append(email)
                 continue
             
             # Email menciona Toby
-            text_to_check = (email['assunto'] + ' ' + email['mensagem']).lower()
-            if 'toby' in text_to_check or 'flenderson' in text_to_check:
+            if TOBY_MENTION_RE.search(email['_searchtext']):
                 relevant.append(email)
         
         return relevant
     
+    def _triage_emails(self, emails: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Aplica a triagem lexical (se configurada) antes da análise por LLM
+        
+        Returns:
+            Lista alinhada com emails: análise pronta para os descartados como
+            benignos, None para os que precisam ir ao LLM
+        """
+        if self.triage is None:
+            return [None] * len(emails)
+        
+        probabilities = self.triage.benign_probability([email['_searchtext'] for email in emails])
+        analyses = [
+            {
+                'is_suspicious': False,
+                'severity': 0,
+                'reasoning': f'Descartado pela triagem lexical (p_benigno={p:.2f})',
+                'evidence_quotes': []
+            } if p > config.CONSPIRACY_TRIAGE_THRESHOLD else None
+            for p in probabilities
+        ]
+        
+        skipped = sum(analysis is not None for analysis in analyses)
+        print(f"✓ Triagem lexical: {skipped} emails descartados como benignos")
+        return analyses
+    
+    def train_triage_model(self, output_path: str) -> LexicalTriage:
+        """
+        Treina a triagem lexical com rótulos gerados pelo LLM (bootstrap)
+        
+        Args:
+            output_path: Caminho do arquivo .pkl a ser gerado
+            
+        Returns:
+            Triagem treinada
+        """
+        emails = self._filter_relevant_emails(load_emails(str(config.EMAILS_PATH)))
+        print(f"🔍 Rotulando {len(emails)} emails com o LLM...")
+        
+        # Todos os lotes enviados ao LLM em paralelo (lotes cuja chamada falhou
+        # são refeitos em _analyze_email_batch)
+        batch_size = max(1, config.CONSPIRACY_BATCH_SIZE)
+        batches = [emails[start:start + batch_size] for start in range(0, len(emails), batch_size)]
+        responses = self.llm.generate_many([self._batch_request(batch) for batch in batches])
+        
+        analyses = []
+        for batch, response_text in zip(batches, responses):
+            analyses.extend(self._analyze_email_batch(batch, response_text))
+        
+        return train_lexical_triage(
+            [email['_searchtext'] for email in emails],
+            [0 if analysis['is_suspicious'] else 1 for analysis in analyses],
+            output_path
+        )
+    
+    def _batch_request(self, emails: List[Dict]) -> Dict:
+        """Monta a chamada ao LLM que analisa um lote de emails de uma vez"""
+        emails_text = "\n\n".join(
+            f"[EMAIL {i}]\n{format_email_for_analysis(email)}"
+            for i, email in enumerate(emails, 1)
+        )
+        user_prompt = f"""Analise estes {len(emails)} emails e retorne JSON:
+
+{emails_text}
+
+JSON:"""
+
+        return {
+            'system_prompt': BATCH_SYSTEM_PROMPT,
+            'user_prompt': user_prompt,
+            'temperature': 0.1,
+            'max_tokens': BATCH_TOKENS_PER_EMAIL * len(emails),
+            'response_format': {"type": "json_object"}
+        }
+    
+    def _analyze_email_batch(self, emails: List[Dict],
+                             response_text: Optional[str] = None) -> List[Dict]:
+        """
+        Analisa um lote de emails em uma única chamada ao LLM
+        
+        Emails cuja análise não vier na resposta (ou vier incompleta) são
+        reanalisados individualmente.
+        
+        Args:
+            emails: Emails do lote
+            response_text: Resposta já obtida para _batch_request(emails); se None,
+                           a chamada é feita aqui
+        
+        Returns:
+            Lista de análises, na mesma ordem dos emails recebidos
+        """
+        if response_text is None and len(emails) == 1:
+            return [self._analyze_single_email(emails[0])]
+        
+        by_index = {}
+        try:
+            if response_text is None:
+                response_text = self.llm.generate(**self._batch_request(emails))
+            
+            required_keys = ['is_suspicious', 'severity', 'reasoning']
+            for position, item in enumerate(orjson.loads(response_text).get('results', []), 1):
+                if not isinstance(item, dict) or not all(key in item for key in required_keys):
+                    continue
+                try:
+                    index = int(item.pop('email', position))
+                except (TypeError, ValueError):
+                    index = position
+                item.setdefault('evidence_quotes', [])
+                by_index[index] = item
+            
+        except orjson.JSONDecodeError:
+            print(f"  ⚠️  Erro ao parsear JSON do lote de {len(emails)} emails")
+        except Exception as e:
+            print(f"  ⚠️  Erro na análise do lote: {str(e)[:50]}")
+        
+        return [
+            by_index[i] if i in by_index else self._analyze_single_email(email)
+            for i, email in enumerate(emails, 1)
+        ]
+    
     def _analyze_single_email(self, email: Dict) -> Dict:
         """
         Analisa um único email para detectar conspiração
@@ -99,34 +314,7 @@ class ConspiracyDetectionAgent:
         email_text = format_email_for_analysis(email)
         
         # Prompt otimizado para Groq/Llama - mais direto e estruturado
-        system_prompt = """Você é um investigador de comportamento corporativo especializado em detectar conspiração e hostilidade.
-
-MISSÃO: Detectar se Michael Scott está conspirando contra Toby Flenderson (representante de RH).
-
-PADRÕES DE CONSPIRAÇÃO:
-1. Comentários depreciativos sobre Toby
-2. Minar a autoridade de Toby
-3. Piadas ou sarcasmo dirigido a Toby
-4. Ignorar procedimentos de RH de Toby
-5. Coordenação com outros contra Toby
-6. Fazer Toby parecer incompetente
-7. Hostilidade velada ou explícita
-
-ESCALA DE SEVERIDADE:
-- 0-3: Normal (sem conspiração)
-- 4-6: Leve (piadas, ignorar menor)
-- 7-8: Moderado (desrespeito claro)
-- 9-10: Alto (conspiração ativa, hostilidade explícita)
-
-FORMATO DE RESPOSTA (JSON estrito):
-{
-    "is_suspicious": true,
-    "severity": 8,
-    "reasoning": "explicação concisa e direta",
-    "evidence_quotes": ["citação 1", "citação 2"]
-}
-
-IMPORTANTE: Responda APENAS com JSON válido, sem texto adicional."""
+        system_prompt = SINGLE_EMAIL_SYSTEM_PROMPT
 
         user_prompt = f"""Analise este email e retorne JSON:
 
@@ -134,41 +322,30 @@ IMPORTANTE: Responda APENAS com JSON válido, sem texto adicional."""
 
 JSON:"""
 
-        # Usar adaptador LLM com retry para parsing JSON
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                response_text = self.llm.generate(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    temperature=0.1,
-                    max_tokens=1024
-                )
-                
-                # Limpar resposta (remover markdown se houver)
-                cleaned_response = response_text.strip()
-                if cleaned_response.startswith('```'):
-                    # Remover ```json e ```
-                    lines = cleaned_response.split('\n')
-                    cleaned_response = '\n'.join(lines[1:-1])
-                
-                # Parsear JSON
-                analysis = json.loads(cleaned_response)
-                
-                # Validar estrutura
-                required_keys = ['is_suspicious', 'severity', 'reasoning']
-                if all(key in analysis for key in required_keys):
-                    return analysis
-                
-            except json.JSONDecodeError as e:
-                if attempt == max_retries - 1:
-                    # Último retry falhou, usar fallback
-                    print(f"  ⚠️  Erro ao parsear JSON no email: {email.get('assunto', 'sem assunto')[:50]}")
-                    break
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    print(f"  ⚠️  Erro na análise: {str(e)[:50]}")
-                    break
+        # Modo JSON do provider garante resposta parseável (sem retry/limpeza de markdown)
+        try:
+            response_text = self.llm.generate(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=0.1,
+                max_tokens=1024,
+                response_format={"type": "json_object"}
+            )
+            
+            analysis = orjson.loads(response_text)
+            
+            # Validar estrutura
+            required_keys = ['is_suspicious', 'severity', 'reasoning']
+            if all(key in analysis for key in required_keys):
+                analysis.setdefault('evidence_quotes', [])
+                return analysis
+            
+            print(f"  ⚠️  JSON incompleto no email: {email.get('assunto', 'sem assunto')[:50]}")
+            
+        except orjson.JSONDecodeError:
+            print(f"  ⚠️  Erro ao parsear JSON no email: {email.get('assunto', 'sem assunto')[:50]}")
+        except Exception as e:
+            print(f"  ⚠️  Erro na análise: {str(e)[:50]}")
         
         # Fallback se não conseguir parsear
         return {
@@ -196,9 +373,15 @@ Recomendação: Nenhuma ação necessária.
 """
         
         # Organizar por severidade
-        high_severity = [e for e in suspicious_emails if e['analysis']['severity'] >= 7]
-        medium_severity = [e for e in suspicious_emails if 4 <= e['analysis']['severity'] < 7]
-        low_severity = [e for e in suspicious_emails if e['analysis']['severity'] < 4]
+        high_severity, medium_severity, low_severity = [], [], []
+        for item in suspicious_emails:
+            severity = item['analysis']['severity']
+            if severity >= 7:
+                high_severity.append(item)
+            elif severity >= 4:
+                medium_severity.append(item)
+            else:
+                low_severity.append(item)
         
         report = f"""
 ╔══════════════════════════════════════════════════════════════════════╗
@@ -219,7 +402,8 @@ ESTATÍSTICAS:
         if high_severity:
             report += "\n🚨 EVIDÊNCIAS DE ALTA SEVERIDADE:\n"
             report += "─" * 70 + "\n"
-            for item in high_severity[:5]:  # Top 5
+            top_high = heapq.nlargest(5, high_severity, key=lambda e: e['analysis']['severity'])
+            for item in top_high:  # Top 5 por severidade
                 email = item['email']
                 analysis = item['analysis']
                 report += f"\nDe: {email['de']}\n"
@@ -256,6 +440,12 @@ def main():
     
     agent = ConspiracyDetectionAgent()
     
+    # Treinar a triagem lexical: python -m agents.conspiracy_agent --train-triage [caminho]
+    if "--train-triage" in sys.argv:
+        args = sys.argv[sys.argv.index("--train-triage") + 1:]
+        agent.train_triage_model(args[0] if args else "models/conspiracy_triage.pkl")
+        return
+    
     print("🔍 Iniciando análise de emails...\n")
     
     start_time = time.time()
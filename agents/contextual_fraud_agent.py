@@ -5,13 +5,113 @@ Analisa emails em conjunto com transações para detectar fraudes
 que só são visíveis com contexto de comunicação.
 """
 
+import csv
+import io
 import pandas as pd
-from typing import List, Dict
-import json
+from typing import List, Dict, Optional, Tuple
+import orjson
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import config
-from utils.document_loader import load_transactions, load_emails, format_email_for_analysis
-from utils.llm_adapter import LLMAdapter
+from utils.document_loader import load_transactions, load_emails_df, format_email_for_analysis
+from utils.llm_adapter import LLMAdapter, get_adapter
+from utils.json_utils import parse_llm_json
+from utils.keyword_matcher import KeywordMatcher
+from utils.result_cache import ResultCache
+from utils.concurrency import ContextThreadPoolExecutor
+
+# Palavras-chave da triagem de cada estratégia (busca sem diferenciar maiúsculas)
+SUSPICIOUS_KEYWORDS = [
+    'compra', 'purchase', 'aprovação', 'approval', 'autorização', 'authorization',
+    '$', 'valor', 'amount', 'despesa', 'expense', 'reembolso', 'reimbursement',
+    'dividir', 'split', 'juntos', 'together', 'combinar', 'combine'
+]
+JUSTIFICATION_KEYWORDS = [
+    'cliente', 'client', 'reunião', 'meeting', 'necessário', 'necessary',
+    'emergência', 'emergency', 'urgente', 'urgent', 'projeto', 'project'
+]
+HIDING_KEYWORDS = [
+    'não mencione', "don't mention", 'segredo', 'secret', 'confidencial', 'confidential',
+    'entre nós', 'between us', 'só você', 'just you', 'discreto', 'discreet'
+]
+
+
+# Autômatos multi-padrão, montados uma vez na importação
+SUSPICIOUS_MATCHER = KeywordMatcher(SUSPICIOUS_KEYWORDS)
+JUSTIFICATION_MATCHER = KeywordMatcher(JUSTIFICATION_KEYWORDS)
+HIDING_MATCHER = KeywordMatcher(HIDING_KEYWORDS)
+
+# System prompts das três estratégias
+COORDINATION_SYSTEM_PROMPT = """Você é um auditor especializado em detectar fraudes corporativas.
+Analise o email e transações para identificar se há coordenação fraudulenta.
+
+SINAIS DE FRAUDE COORDENADA:
+- Múltiplas pessoas dividindo compras para evitar limites
+- Combinação para criar justificativas falsas
+- Acordo para não reportar certas informações
+- Divisão de responsabilidade para dificultar auditoria
+
+IMPORTANTE: Responda APENAS com JSON válido (sem markdown).
+
+Formato da resposta:
+{
+  "is_fraud": true/false,
+  "severity": 0-10,
+  "reason": "explicação breve",
+  "evidence": "evidência específica do email",
+  "participants": ["nome1", "nome2"]
+}
+
+Se NÃO houver fraude coordenada, responda apenas: {"is_fraud": false}"""
+
+JUSTIFICATION_SYSTEM_PROMPT = """Você é um auditor analisando justificativas de despesas.
+Identifique se a justificativa é falsa, exagerada ou enganosa.
+
+SINAIS DE JUSTIFICATIVA FALSA:
+- Alegação de "cliente" sem especificar quem
+- "Emergência" sem detalhes concretos
+- Justificativas vagas ou genéricas
+- Contradições com a descrição da compra
+
+IMPORTANTE: Responda APENAS com JSON válido.
+
+Formato:
+{
+  "is_false": true/false,
+  "severity": 0-10,
+  "reason": "por que é falsa",
+  "evidence": "trecho específico do email"
+}
+
+Se a justificativa NÃO for falsa, responda apenas: {"is_false": false}"""
+
+HIDING_SYSTEM_PROMPT = """Você é um auditor investigando ocultação de informações.
+Identifique se o email tenta esconder informações relevantes.
+
+SINAIS DE OCULTAÇÃO:
+- Pedidos de sigilo inadequados
+- "Não mencione isso para..."
+- Combinação para omitir fatos
+- Destruição ou não registro de informações
+
+IMPORTANTE: Responda APENAS com JSON válido.
+
+Formato:
+{
+  "is_hiding": true/false,
+  "severity": 0-10,
+  "reason": "o que está sendo ocultado",
+  "evidence": "trecho do email"
+}
+
+Se NÃO houver ocultação, responda apenas: {"is_hiding": false}"""
+
+# Campos de veredito das três estratégias (true = indício encontrado)
+VERDICT_KEYS = ('is_fraud', 'is_false', 'is_hiding')
+
+# Tokens da triagem pelo modelo barato: cabe o veredito negativo curto
+# ({"is_fraud": false}); respostas positivas são cortadas e escaladas
+CHEAP_SCREEN_MAX_TOKENS = 16
 
 
 class ContextualFraudDetector:
@@ -19,8 +119,16 @@ class ContextualFraudDetector:
     Detector que usa contexto de emails para identificar fraudes
     """
     
-    def __init__(self):
-        self.llm = LLMAdapter()
+    def __init__(self, llm: Optional[LLMAdapter] = None):
+        self.llm = llm or get_adapter()
+        
+        # Índice funcionário (minúsculas) -> primeiras transações, montado em
+        # analyze_contextual_frauds
+        self._employee_index: Dict[str, pd.DataFrame] = {}
+        
+        # Análises já feitas por detector, reaproveitadas entre execuções
+        # (criado em analyze_contextual_frauds, desativável com --no-cache)
+        self.result_cache: Optional[ResultCache] = None
         
     def analyze_contextual_frauds(self) -> Dict:
         """
@@ -33,27 +141,52 @@ class ContextualFraudDetector:
         
         # Carregar dados
         print("📧 Carregando emails e transações...")
-        emails = load_emails(str(config.EMAILS_PATH))
+        emails_df = load_emails_df(str(config.EMAILS_PATH))
         df = load_transactions(str(config.TRANSACTIONS_PATH))
-        print(f"✓ {len(emails)} emails e {len(df)} transações carregados")
+        print(f"✓ {len(emails_df)} emails e {len(df)} transações carregados")
+        
+        # Entradas do cache são invalidadas quando emails ou transações mudam
+        if config.LLM_CACHE_ENABLED:
+            self.result_cache = ResultCache(
+                config.CACHE_DIR, [config.EMAILS_PATH, config.TRANSACTIONS_PATH]
+            )
+        
+        # Transações por funcionário, consultadas por nome em cada email (sem varrer o DataFrame)
+        self._employee_index = self._build_employee_index(df)
+        
+        # Triagem por palavra-chave das três estratégias em uma única passada
+        suspicious_emails, justification_emails, hiding_emails = self._bucket_emails(emails_df)
         
         frauds = []
         
         print("\n🔍 Analisando fraudes contextuais...")
         start_time = time.time()
         
-        # Estratégia 1: Fraude coordenada (múltiplas pessoas)
-        coordinated = self._detect_coordinated_fraud(emails, df)
+        # As três estratégias são independentes: rodam ao mesmo tempo, compartilhando
+        # um único pool de chamadas ao LLM (limitado a config.LLM_MAX_WORKERS)
+        with ContextThreadPoolExecutor(max_workers=config.LLM_MAX_WORKERS) as llm_executor, \
+                ContextThreadPoolExecutor(max_workers=3) as detector_executor:
+            # Estratégia 1: Fraude coordenada (múltiplas pessoas)
+            coordinated_future = detector_executor.submit(
+                self._detect_coordinated_fraud, suspicious_emails, llm_executor
+            )
+            # Estratégia 2: Justificativas falsas
+            false_justifications_future = detector_executor.submit(
+                self._detect_false_justifications, justification_emails, llm_executor
+            )
+            # Estratégia 3: Ocultação de informação
+            hidden_info_future = detector_executor.submit(
+                self._detect_hidden_information, hiding_emails, llm_executor
+            )
+            
+            coordinated = coordinated_future.result()
+            false_justifications = false_justifications_future.result()
+            hidden_info = hidden_info_future.result()
+        
         frauds.extend(coordinated)
         print(f"  ✓ Fraude coordenada: {len(coordinated)} casos")
-        
-        # Estratégia 2: Justificativas falsas
-        false_justifications = self._detect_false_justifications(emails, df)
         frauds.extend(false_justifications)
         print(f"  ✓ Justificativas falsas: {len(false_justifications)} casos")
-        
-        # Estratégia 3: Ocultação de informação
-        hidden_info = self._detect_hidden_information(emails, df)
         frauds.extend(hidden_info)
         print(f"  ✓ Ocultação de informação: {len(hidden_info)} casos")
         
@@ -61,194 +194,320 @@ class ContextualFraudDetector:
         print(f"\n⏱️  Tempo de análise: {elapsed:.2f}s")
         
         # Gerar relatório
-        report = self._generate_report(frauds, len(emails), len(df))
+        report = self._generate_report(frauds, len(emails_df), len(df))
         
         return {
-            'total_emails': len(emails),
+            'total_emails': len(emails_df),
             'total_transactions': len(df),
             'contextual_frauds': frauds,
             'total_frauds': len(frauds),
             'report': report
         }
     
-    def _detect_coordinated_fraud(self, emails: List[Dict], df: pd.DataFrame) -> List[Dict]:
+    def _detect_coordinated_fraud(self, suspicious_emails: List[Dict],
+                                  executor: ThreadPoolExecutor) -> List[Dict]:
         """Detecta fraudes que envolvem coordenação entre múltiplas pessoas"""
         frauds = []
         
-        # Filtrar emails suspeitos (mencionam valores, compras, aprovação)
-        suspicious_keywords = [
-            'compra', 'purchase', 'aprovação', 'approval', 'autorização', 'authorization',
-            '$', 'valor', 'amount', 'despesa', 'expense', 'reembolso', 'reimbursement',
-            'dividir', 'split', 'juntos', 'together', 'combinar', 'combine'
-        ]
-        
-        suspicious_emails = []
-        for email in emails:
-            mensagem_lower = email.get('mensagem', '').lower()
-            if any(keyword in mensagem_lower for keyword in suspicious_keywords):
-                suspicious_emails.append(email)
-        
         # Limitar a 20 emails mais suspeitos para performance
         suspicious_emails = suspicious_emails[:20]
         
         print(f"    → Analisando {len(suspicious_emails)} emails suspeitos...")
         
-        for i, email in enumerate(suspicious_emails, 1):
-            if i % 5 == 0:
-                print(f"      Processando {i}/{len(suspicious_emails)}...")
-            
-            # Analisar email com LLM
-            try:
-                analysis = self._analyze_email_for_fraud_coordination(email, df)
-                
-                if analysis and analysis.get('is_fraud', False):
-                    frauds.append({
-                        'email': email,
-                        'analysis': analysis,
-                        'violation_type': 'FRAUDE_COORDENADA',
-                        'severity': analysis.get('severity', 5),
-                        'evidence': analysis.get('evidence', ''),
-                        'reason': analysis.get('reason', '')
-                    })
-            except Exception as e:
-                print(f"      ⚠️  Erro ao analisar email: {str(e)}")
-                continue
+        # Analisar emails com LLM (em paralelo)
+        analyses = self._analyze_emails_concurrently(
+            executor, self._coordination_request, suspicious_emails, "email"
+        )
+        
+        for email, analysis in zip(suspicious_emails, analyses):
+            if analysis and analysis.get('is_fraud', False):
+                frauds.append({
+                    'email': email,
+                    'analysis': analysis,
+                    'violation_type': 'FRAUDE_COORDENADA',
+                    'severity': analysis.get('severity', 5),
+                    'evidence': analysis.get('evidence', ''),
+                    'reason': analysis.get('reason', '')
+                })
         
         return frauds
     
-    def _detect_false_justifications(self, emails: List[Dict], df: pd.DataFrame) -> List[Dict]:
+    def _detect_false_justifications(self, justification_emails: List[Dict],
+                                     executor: ThreadPoolExecutor) -> List[Dict]:
         """Detecta justificativas falsas ou enganosas para despesas"""
         frauds = []
         
-        # Filtrar emails que justificam despesas
-        justification_keywords = [
-            'cliente', 'client', 'reunião', 'meeting', 'necessário', 'necessary',
-            'emergência', 'emergency', 'urgente', 'urgent', 'projeto', 'project'
-        ]
-        
-        justification_emails = []
-        for email in emails:
-            mensagem_lower = email.get('mensagem', '').lower()
-            if any(keyword in mensagem_lower for keyword in justification_keywords):
-                justification_emails.append(email)
-        
         # Limitar para performance
         justification_emails = justification_emails[:20]
         
         print(f"    → Analisando {len(justification_emails)} emails com justificativas...")
         
-        for i, email in enumerate(justification_emails, 1):
-            if i % 5 == 0:
-                print(f"      Processando {i}/{len(justification_emails)}...")
-            
-            try:
-                analysis = self._analyze_justification(email, df)
-                
-                if analysis and analysis.get('is_false', False):
-                    frauds.append({
-                        'email': email,
-                        'analysis': analysis,
-                        'violation_type': 'JUSTIFICATIVA_FALSA',
-                        'severity': analysis.get('severity', 6),
-                        'evidence': analysis.get('evidence', ''),
-                        'reason': analysis.get('reason', '')
-                    })
-            except Exception as e:
-                print(f"      ⚠️  Erro ao analisar justificativa: {str(e)}")
-                continue
+        analyses = self._analyze_emails_concurrently(
+            executor, self._justification_request, justification_emails, "justificativa"
+        )
+        
+        for email, analysis in zip(justification_emails, analyses):
+            if analysis and analysis.get('is_false', False):
+                frauds.append({
+                    'email': email,
+                    'analysis': analysis,
+                    'violation_type': 'JUSTIFICATIVA_FALSA',
+                    'severity': analysis.get('severity', 6),
+                    'evidence': analysis.get('evidence', ''),
+                    'reason': analysis.get('reason', '')
+                })
         
         return frauds
     
-    def _detect_hidden_information(self, emails: List[Dict], df: pd.DataFrame) -> List[Dict]:
+    def _detect_hidden_information(self, hiding_emails: List[Dict],
+                                   executor: ThreadPoolExecutor) -> List[Dict]:
         """Detecta tentativas de ocultar informações relevantes"""
         frauds = []
         
-        # Filtrar emails com possível ocultação
-        hiding_keywords = [
-            'não mencione', "don't mention", 'segredo', 'secret', 'confidencial', 'confidential',
-            'entre nós', 'between us', 'só você', 'just you', 'discreto', 'discreet'
-        ]
+        print(f"    → Analisando {len(hiding_emails)} emails com possível ocultação...")
         
-        hiding_emails = []
-        for email in emails:
-            mensagem_lower = email.get('mensagem', '').lower()
-            if any(keyword in mensagem_lower for keyword in hiding_keywords):
-                hiding_emails.append(email)
+        analyses = self._analyze_emails_concurrently(
+            executor, self._hiding_request, hiding_emails, "ocultação"
+        )
+        
+        for email, analysis in zip(hiding_emails, analyses):
+            if analysis and analysis.get('is_hiding', False):
+                frauds.append({
+                    'email': email,
+                    'analysis': analysis,
+                    'violation_type': 'OCULTACAO_INFORMACAO',
+                    'severity': analysis.get('severity', 8),
+                    'evidence': analysis.get('evidence', ''),
+                    'reason': analysis.get('reason', '')
+                })
         
-        print(f"    → Analisando {len(hiding_emails)} emails com possível ocultação...")
+        return frauds
+    
+    def _build_employee_index(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Agrupa as transações por funcionário (nome em minúsculas)
         
-        for i, email in enumerate(hiding_emails, 1):
+        Args:
+            df: DataFrame de transações
+            
+        Returns:
+            Dict nome -> primeiras 10 transações do funcionário, com a linha já
+            formatada para o prompt na coluna '_tx_line'
+        """
+        # Formatar todas as linhas de uma vez (vetorizado), em vez de linha a linha no prompt
+        df = df.assign(_tx_line=(
+            "- " + df['funcionario'] + ": $" + df['valor'].map('{:.2f}'.format)
+            + " - " + df['descricao'] + " (" + df['data'].map(str) + ")"
+        ))
+        
+        return {
+            name: group.head(10)
+            for name, group in df.groupby(df['funcionario'].str.lower(), sort=False)
+        }
+    
+    def _bucket_emails(self, emails_df: pd.DataFrame) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """
+        Separa os emails candidatos de cada estratégia em uma única passada
+        sobre a coluna de mensagens
+        
+        Um email pode entrar em mais de uma lista. Só as linhas selecionadas
+        são convertidas para dict (formato usado na montagem dos prompts).
+        
+        Args:
+            emails_df: DataFrame de emails (load_emails_df)
+            
+        Returns:
+            Tupla (suspeitos, com justificativas, com possível ocultação),
+            cada lista na ordem original
+        """
+        suspicious, justification, hiding = [], [], []
+        
+        # Mensagens já em minúsculas desde o carregamento (uma única cópia por email)
+        for position, mensagem_lower in enumerate(emails_df['_msg_lower']):
+            # Mencionam valores, compras, aprovação
+            if SUSPICIOUS_MATCHER.contains_any(mensagem_lower):
+                suspicious.append(position)
+            # Justificam despesas
+            if JUSTIFICATION_MATCHER.contains_any(mensagem_lower):
+                justification.append(position)
+            # Pedem sigilo
+            if HIDING_MATCHER.contains_any(mensagem_lower):
+                hiding.append(position)
+        
+        # Cada email candidato vira um único dict (compartilhado entre as listas), com o
+        # texto formatado para o prompt e os participantes calculados uma só vez
+        selected = sorted(set(suspicious) | set(justification) | set(hiding))
+        records = dict(zip(selected, emails_df.iloc[selected].to_dict('records')))
+        for email in records.values():
+            email['_formatted'] = format_email_for_analysis(email)
+            email['_participants'] = self._extract_participants(email)
+        
+        return tuple(
+            [records[position] for position in positions]
+            for positions in (suspicious, justification, hiding)
+        )
+    
+    def _extract_participants(self, email: Dict) -> List[str]:
+        """
+        Extrai os nomes dos participantes a partir dos endereços (nome.sobrenome@...)
+        do remetente e de todos os destinatários
+        
+        Returns:
+            Nomes em minúsculas, sem repetição (mesmo formato das chaves do índice de funcionários)
+        """
+        participant_names = []
+        for address in (email['_de_lc'], *email['_para_lc']):
+            if '@' in address:
+                name = address.split('@')[0].replace('.', ' ')
+                if name not in participant_names:
+                    participant_names.append(name)
+        return participant_names
+    
+    def _analyze_emails_concurrently(self, executor: ThreadPoolExecutor, request_fn,
+                                     emails: List[Dict], label: str) -> List[Optional[Dict]]:
+        """
+        Executa a análise por LLM de cada email em paralelo
+        
+        As chamadas ao LLM são limitadas por rede; o pool recebido é compartilhado
+        pelos três detectores, mantendo no máximo config.LLM_MAX_WORKERS requisições
+        em andamento ao mesmo tempo. Com config.LLM_BATCH_API, as chamadas são
+        enviadas de uma vez como um job da Batch API do provider. Emails já
+        analisados em execuções anteriores (mesma chamada ao LLM, mesmos participantes
+        e arquivos de origem inalterados) vêm do cache de resultados.
+        
+        Args:
+            executor: Pool de threads das chamadas ao LLM
+            request_fn: Método que monta a chamada ao LLM de um email
+            emails: Emails a analisar
+            label: Descrição usada nas mensagens de erro
+            
+        Returns:
+            Lista de análises (None em caso de erro), na mesma ordem dos emails
+        """
+        analyses = [None] * len(emails)
+        requests = [request_fn(email) for email in emails]
+        
+        # Emails já analisados por este detector em execuções anteriores; a chave
+        # inclui a chamada exata (prompts e parâmetros), então editar um prompt
+        # invalida os vereditos antigos
+        keys = [None] * len(emails)
+        if self.result_cache is not None:
+            namespace = f"{request_fn.__name__}:{self.llm.model}:{config.CHEAP_MODEL_NAME}"
+            for i, (email, request) in enumerate(zip(emails, requests)):
+                keys[i] = self.result_cache.make_key(
+                    namespace,
+                    orjson.dumps(request, option=orjson.OPT_SORT_KEYS).decode('utf-8'),
+                    email['_de_lc'],
+                    ','.join(email['_para_lc'])
+                )
+                analyses[i] = self.result_cache.get(keys[i])
+        
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if not pending:
+            return analyses
+        
+        if config.LLM_BATCH_API:
             try:
-                analysis = self._analyze_information_hiding(email, df)
-                
-                if analysis and analysis.get('is_hiding', False):
-                    frauds.append({
-                        'email': email,
-                        'analysis': analysis,
-                        'violation_type': 'OCULTACAO_INFORMACAO',
-                        'severity': analysis.get('severity', 8),
-                        'evidence': analysis.get('evidence', ''),
-                        'reason': analysis.get('reason', '')
-                    })
+                responses = self.llm.generate_batch_job([requests[i] for i in pending])
             except Exception as e:
-                print(f"      ⚠️  Erro ao analisar ocultação: {str(e)}")
-                continue
+                print(f"      ⚠️  Erro no batch job ({label}): {str(e)}")
+                responses = []
+            for i, response in zip(pending, responses):
+                analyses[i] = self._parse_analysis(response) if response else None
+        else:
+            futures = {
+                executor.submit(self._run_analysis, requests[i]): i
+                for i in pending
+            }
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                if completed % 5 == 0:
+                    print(f"      Processando {completed}/{len(pending)}...")
+                try:
+                    analyses[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"      ⚠️  Erro ao analisar {label}: {str(e)}")
+        
+        # Só análises válidas são guardadas; erros são refeitos na próxima execução
+        if self.result_cache is not None:
+            for i in pending:
+                if analyses[i] is not None:
+                    self.result_cache.set(keys[i], analyses[i])
+        
+        return analyses
+    
+    def _run_analysis(self, request: Dict) -> Optional[Dict]:
+        """
+        Envia uma chamada ao LLM e interpreta a resposta JSON
         
-        return frauds
+        Com config.CHEAP_MODEL_NAME, o modelo barato faz a triagem primeiro: vereditos
+        negativos são aceitos direto e só os demais seguem para o modelo principal.
+        
+        Args:
+            request: Dict com system_prompt, user_prompt, temperature e max_tokens
+            
+        Returns:
+            Análise parseada ou None em caso de erro
+        """
+        if config.CHEAP_MODEL_NAME:
+            screening = self._cheap_screen(request)
+            if screening is not None:
+                return screening
+        
+        try:
+            response = self.llm.generate(**request)
+        except Exception as e:
+            print(f"      ⚠️  Erro na análise: {e}")
+            return None
+        
+        return self._parse_analysis(response)
     
-    def _analyze_email_for_fraud_coordination(self, email: Dict, df: pd.DataFrame) -> Dict:
-        """Usa LLM para analisar se email indica fraude coordenada"""
+    def _cheap_screen(self, request: Dict) -> Optional[Dict]:
+        """
+        Triagem pelo modelo barato
         
-        # CORREÇÃO: Usar get() com fallback para normalizar campos
-        remetente = email.get('remetente', email.get('de', 'Desconhecido'))
-        destinatario = email.get('destinatario', email.get('para', 'Desconhecido'))
+        Returns:
+            Análise negativa, se o modelo barato não encontrou indício; None para
+            escalar ao modelo principal (positivo, resposta cortada ou erro)
+        """
+        try:
+            response = self.llm.cheap_generate(**{**request, 'max_tokens': CHEAP_SCREEN_MAX_TOKENS})
+            verdict = parse_llm_json(response)
+        except Exception:
+            return None
         
-        # Extrair nomes dos participantes
-        participants = [remetente, destinatario]
+        if isinstance(verdict, dict) and any(verdict.get(key) is False for key in VERDICT_KEYS):
+            return verdict
+        return None
+    
+    def _parse_analysis(self, response: str) -> Optional[Dict]:
+        """Remove cercas de markdown da resposta e parseia o JSON"""
+        try:
+            return parse_llm_json(response)
+            
+        except orjson.JSONDecodeError as e:
+            print(f"      ⚠️  Erro ao parsear JSON: {e}")
+            print(f"      Resposta: {response[:200]}...")
+            return None
+    
+    def _coordination_request(self, email: Dict) -> Dict:
+        """Monta a chamada ao LLM que analisa se email indica fraude coordenada"""
         
-        # Buscar transações dos participantes
-        participant_names = []
-        for p in participants:
-            # Extrair nome (antes do @)
-            if '@' in p:
-                name = p.split('@')[0].replace('.', ' ').title()
-                participant_names.append(name)
-        
-        # Filtrar transações
-        if participant_names:
-            mask = df['funcionario'].str.contains('|'.join(participant_names), case=False, na=False)
-            relevant_transactions = df[mask].head(10)
+        # Buscar transações dos participantes no índice (primeiras 10, na ordem do CSV)
+        groups = [self._employee_index[name] for name in email['_participants'] if name in self._employee_index]
+        if groups:
+            relevant_transactions = pd.concat(groups).sort_index().head(10)
         else:
             relevant_transactions = pd.DataFrame()
         
         # Preparar prompt
-        system_prompt = """Você é um auditor especializado em detectar fraudes corporativas.
-Analise o email e transações para identificar se há coordenação fraudulenta.
-
-SINAIS DE FRAUDE COORDENADA:
-- Múltiplas pessoas dividindo compras para evitar limites
-- Combinação para criar justificativas falsas
-- Acordo para não reportar certas informações
-- Divisão de responsabilidade para dificultar auditoria
-
-IMPORTANTE: Responda APENAS com JSON válido (sem markdown).
-
-Formato da resposta:
-{
-  "is_fraud": true/false,
-  "severity": 0-10,
-  "reason": "explicação breve",
-  "evidence": "evidência específica do email",
-  "participants": ["nome1", "nome2"]
-}"""
-
-        email_formatted = format_email_for_analysis(email)
+        email_formatted = email['_formatted']
         
         transactions_text = ""
         if not relevant_transactions.empty:
-            transactions_text = "\n\nTRANSAÇÕES RELACIONADAS:\n"
-            for _, tx in relevant_transactions.iterrows():
-                transactions_text += f"- {tx['funcionario']}: ${tx['valor']:.2f} - {tx['descricao']} ({tx['data']})\n"
+            transactions_text = "\n\nTRANSAÇÕES RELACIONADAS:\n" + "".join(
+                line + "\n" for line in relevant_transactions['_tx_line']
+            )
         
         user_prompt = f"""EMAIL:
 {email_formatted}
@@ -256,129 +515,45 @@ Formato da resposta:
 
 Analise se este email indica fraude coordenada."""
 
-        try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=0,
-                max_tokens=500
-            )
-            
-            # Limpar resposta
-            cleaned = response.strip()
-            if cleaned.startswith('```'):
-                lines = cleaned.split('\n')
-                cleaned = '\n'.join(lines[1:-1]) if len(lines) > 2 else cleaned
-                cleaned = cleaned.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(cleaned)
-            return analysis
-            
-        except json.JSONDecodeError as e:
-            print(f"      ⚠️  Erro ao parsear JSON: {e}")
-            print(f"      Resposta: {response[:200]}...")
-            return None
-        except Exception as e:
-            print(f"      ⚠️  Erro na análise: {e}")
-            return None
+        return {
+            'system_prompt': COORDINATION_SYSTEM_PROMPT,
+            'user_prompt': user_prompt,
+            'temperature': 0,
+            'response_format': {"type": "json_object"},
+            'max_tokens': 500
+        }
     
-    def _analyze_justification(self, email: Dict, df: pd.DataFrame) -> Dict:
-        """Analisa se justificativa é falsa ou enganosa"""
-        
-        system_prompt = """Você é um auditor analisando justificativas de despesas.
-Identifique se a justificativa é falsa, exagerada ou enganosa.
-
-SINAIS DE JUSTIFICATIVA FALSA:
-- Alegação de "cliente" sem especificar quem
-- "Emergência" sem detalhes concretos
-- Justificativas vagas ou genéricas
-- Contradições com a descrição da compra
-
-IMPORTANTE: Responda APENAS com JSON válido.
-
-Formato:
-{
-  "is_false": true/false,
-  "severity": 0-10,
-  "reason": "por que é falsa",
-  "evidence": "trecho específico do email"
-}"""
-
-        email_formatted = format_email_for_analysis(email)
+    def _justification_request(self, email: Dict) -> Dict:
+        """Monta a chamada ao LLM que analisa se justificativa é falsa ou enganosa"""
+        email_formatted = email['_formatted']
         user_prompt = f"""EMAIL:
 {email_formatted}
 
 Analise se a justificativa é falsa ou enganosa."""
 
-        try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=0,
-                max_tokens=400
-            )
-            
-            # Limpar e parsear
-            cleaned = response.strip()
-            if cleaned.startswith('```'):
-                lines = cleaned.split('\n')
-                cleaned = '\n'.join(lines[1:-1]) if len(lines) > 2 else cleaned
-                cleaned = cleaned.replace('```json', '').replace('```', '').strip()
-            
-            return json.loads(cleaned)
-            
-        except Exception as e:
-            print(f"      ⚠️  Erro: {e}")
-            return None
+        return {
+            'system_prompt': JUSTIFICATION_SYSTEM_PROMPT,
+            'user_prompt': user_prompt,
+            'temperature': 0,
+            'response_format': {"type": "json_object"},
+            'max_tokens': 400
+        }
     
-    def _analyze_information_hiding(self, email: Dict, df: pd.DataFrame) -> Dict:
-        """Analisa se há tentativa de ocultar informações"""
-        
-        system_prompt = """Você é um auditor investigando ocultação de informações.
-Identifique se o email tenta esconder informações relevantes.
-
-SINAIS DE OCULTAÇÃO:
-- Pedidos de sigilo inadequados
-- "Não mencione isso para..."
-- Combinação para omitir fatos
-- Destruição ou não registro de informações
-
-IMPORTANTE: Responda APENAS com JSON válido.
-
-Formato:
-{
-  "is_hiding": true/false,
-  "severity": 0-10,
-  "reason": "o que está sendo ocultado",
-  "evidence": "trecho do email"
-}"""
-
-        email_formatted = format_email_for_analysis(email)
+    def _hiding_request(self, email: Dict) -> Dict:
+        """Monta a chamada ao LLM que analisa se há tentativa de ocultar informações"""
+        email_formatted = email['_formatted']
         user_prompt = f"""EMAIL:
 {email_formatted}
 
 Analise se há tentativa de ocultar informações."""
 
-        try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=0,
-                max_tokens=400
-            )
-            
-            # Limpar e parsear
-            cleaned = response.strip()
-            if cleaned.startswith('```'):
-                lines = cleaned.split('\n')
-                cleaned = '\n'.join(lines[1:-1]) if len(lines) > 2 else cleaned
-                cleaned = cleaned.replace('```json', '').replace('```', '').strip()
-            
-            return json.loads(cleaned)
-            
-        except Exception as e:
-            print(f"      ⚠️  Erro: {e}")
-            return None
+        return {
+            'system_prompt': HIDING_SYSTEM_PROMPT,
+            'user_prompt': user_prompt,
+            'temperature': 0,
+            'response_format': {"type": "json_object"},
+            'max_tokens': 400
+        }
     
     def _generate_report(self, frauds: List[Dict], total_emails: int, total_transactions: int) -> str:
         """Gera relatório consolidado"""
@@ -407,7 +582,9 @@ Recomendação: Nenhuma ação necessária.
         
         high_severity = [f for f in frauds if f['severity'] >= 8]
         
-        report = f"""
+        # Montar o relatório em um buffer (sem concatenações sucessivas de string)
+        report = io.StringIO()
+        report.write(f"""
 ╔══════════════════════════════════════════════════════════════════════╗
 ║         RELATÓRIO DE AUDITORIA - FRAUDES CONTEXTUAIS                 ║
 ╚══════════════════════════════════════════════════════════════════════╝
@@ -421,14 +598,14 @@ ESTATÍSTICAS:
 - Alta severidade (≥8): {len(high_severity)}
 
 VIOLAÇÕES POR TIPO:
-"""
+""")
         
         for vtype, items in sorted(by_type.items(), key=lambda x: -len(x[1])):
-            report += f"  • {vtype}: {len(items)} caso(s)\n"
+            report.write(f"  • {vtype}: {len(items)} caso(s)\n")
         
-        report += "\n" + "─"*70 + "\n"
-        report += "TOP 10 CASOS MAIS SEVEROS:\n"
-        report += "─"*70 + "\n\n"
+        report.write("\n" + "─"*70 + "\n")
+        report.write("TOP 10 CASOS MAIS SEVEROS:\n")
+        report.write("─"*70 + "\n\n")
         
         # Ordenar por severidade
         sorted_frauds = sorted(frauds, key=lambda x: -x['severity'])
@@ -437,19 +614,15 @@ VIOLAÇÕES POR TIPO:
             email = fraud['email']
             analysis = fraud['analysis']
             
-            # CORREÇÃO: Normalizar campos aqui também
-            remetente = email.get('remetente', email.get('de', 'Desconhecido'))
-            destinatario = email.get('destinatario', email.get('para', 'Desconhecido'))
-            
-            report += f"[{i}] {fraud['violation_type']} - Severidade: {fraud['severity']}/10\n"
-            report += f"    De: {remetente}\n"
-            report += f"    Para: {destinatario}\n"
-            report += f"    Assunto: {email.get('assunto', 'N/A')}\n"
-            report += f"    Razão: {fraud['reason']}\n"
-            report += f"    Evidência: {fraud['evidence'][:100]}...\n"
-            report += "\n"
-        
-        report += f"""
+            report.write(f"[{i}] {fraud['violation_type']} - Severidade: {fraud['severity']}/10\n")
+            report.write(f"    De: {email['remetente']}\n")
+            report.write(f"    Para: {email['destinatario']}\n")
+            report.write(f"    Assunto: {email['assunto']}\n")
+            report.write(f"    Razão: {fraud['reason']}\n")
+            report.write(f"    Evidência: {fraud['evidence'][:100]}...\n")
+            report.write("\n")
+        
+        report.write(f"""
 {'─'*70}
 CONCLUSÃO:
 ⚠️  {len(frauds)} fraude(s) contextual(is) detectada(s)
@@ -461,9 +634,9 @@ Este tipo de fraude é particularmente grave pois envolve:
 - Violação de confiança e ética profissional
 
 Relatório gerado pelo Sistema de Auditoria Dunder Mifflin
-"""
+""")
         
-        return report
+        return report.getvalue()
 
 
 def main():
@@ -488,31 +661,28 @@ def main():
     if results['contextual_frauds']:
         print("\n💾 Salvando detalhes das fraudes contextuais...")
         
-        fraud_details = []
-        for fraud in results['contextual_frauds']:
-            email = fraud['email']
-            
-            # CORREÇÃO: Normalizar campos aqui também
-            remetente = email.get('remetente', email.get('de', 'Desconhecido'))
-            destinatario = email.get('destinatario', email.get('para', 'Desconhecido'))
+        # Escrever linha a linha, sem montar uma tabela intermediária em memória
+        output_path = 'fraudes_contextuais.csv'
+        fieldnames = ['de', 'para', 'assunto', 'data', 'violation_type', 'severity', 'reason', 'evidence']
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+            writer.writeheader()
             
-            fraud_details.append({
-                'de': remetente,
-                'para': destinatario,
-                'assunto': email.get('assunto', 'N/A'),
-                'data': email.get('data', 'N/A'),
-                'violation_type': fraud['violation_type'],
-                'severity': fraud['severity'],
-                'reason': fraud['reason'],
-                'evidence': fraud['evidence'][:200]
-            })
-        
-        if fraud_details:
-            import pandas as pd
-            df_frauds = pd.DataFrame(fraud_details)
-            output_path = 'fraudes_contextuais.csv'
-            df_frauds.to_csv(output_path, index=False, encoding='utf-8')
-            print(f"✓ Arquivo salvo: {output_path}")
+            for fraud in results['contextual_frauds']:
+                email = fraud['email']
+                writer.writerow({
+                    'de': email['remetente'],
+                    'para': email['destinatario'],
+                    'assunto': email['assunto'],
+                    'data': email['data'],
+                    'violation_type': fraud['violation_type'],
+                    'severity': fraud['severity'],
+                    'reason': fraud['reason'],
+                    'evidence': fraud['evidence'][:200]
+                })
+        
+        print(f"✓ Arquivo salvo: {output_path}")
 
 
 if __name__ == "__main__":
@@ -10,23 +10,58 @@ Arquitetura:
 - LLM: Groq (Llama 3.1 70B ou modelo configurado) para interpretação de regras complexas
 """
 
+import csv
+import re
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import config
 from utils.document_loader import load_transactions, load_compliance_policy
-from utils.llm_adapter import LLMAdapter
+from utils.llm_adapter import LLMAdapter, get_adapter
+from utils.keyword_matcher import KeywordMatcher
 import time
 
 
+# Palavras-chave da Seção 3 (Lista Negra de Itens), buscadas na descrição em minúsculas
+PROHIBITED_KEYWORDS = [
+    'mágica', 'magic', 'karaokê', 'karaoke', 'algema', 'handcuff',
+    'corrente', 'chain', 'fumaça', 'smoke', 'pombo', 'pigeon',
+    'stripper', 'baralho marcado', 'discoteca', 'disco',
+    'arma', 'weapon', 'gun', 'airsoft', 'espada', 'sword', 'katana',
+    'ninja', 'nunchaku', 'spray de pimenta', 'pepper spray',
+    'camuflagem', 'camouflage', 'armadilha', 'trap',
+    'vela artesanal', 'candle', 'startup', 'rede social', 'social network',
+    'beterraba', 'beet', 'binóculo', 'binocular', 'vigilância', 'surveillance',
+    'walkie talkie', 'walkie-talkie'
+]
+
+# Locais restritos da Seção 2.1
+RESTRICTED_LOCATIONS = ['hooters', 'hooter']
+
+# Autômatos Aho-Corasick: todas as palavras-chave em uma única passada por descrição
+PROHIBITED_MATCHER = KeywordMatcher(PROHIBITED_KEYWORDS)
+RESTRICTED_MATCHER = KeywordMatcher(RESTRICTED_LOCATIONS)
+
+# Colunas de cada violação (as regras acrescentam tx_id, usado na deduplicação)
+VIOLATION_COLUMNS = ['transaction', 'violation_type', 'severity', 'rule', 'reason', 'evidence']
+
+# Colunas auxiliares criadas em _prepare_transactions (fora dos dicts de transação)
+AUXILIARY_COLUMNS = ['descricao_lower', '_prohibited_item', '_restricted_location', '_has_po']
+
+# Indícios de Purchase Order na descrição (Seção 1.3), só como termo isolado:
+# "po" dentro de palavras como "suporte" ou "ponto" não conta como PO
+PO_PATTERN = re.compile(r'(?<!\w)(?:po|p\.o\.|purchase\s+order)(?!\w)', re.IGNORECASE)
+
+
 class StandaloneFraudDetector:
     """
     Detector de fraudes que não requerem contexto de emails
     Compatível com múltiplos provedores de LLM via LLMAdapter
     """
     
-    def __init__(self):
-        # Usar adaptador universal de LLM
-        self.llm = LLMAdapter()
+    def __init__(self, llm: Optional[LLMAdapter] = None):
+        # Usar adaptador universal de LLM (compartilhado, se fornecido)
+        self.llm = llm or get_adapter()
         self.compliance_policy = load_compliance_policy(str(config.COMPLIANCE_POLICY_PATH))
         
     def analyze_transactions(self) -> Dict:
@@ -40,7 +75,7 @@ class StandaloneFraudDetector:
         df = load_transactions(str(config.TRANSACTIONS_PATH))
         print(f"✓ {len(df)} transações carregadas")
         
-        fraudulent_transactions = []
+        df = self._prepare_transactions(df)
         
         # Aplicar múltiplas checagens
         print("\n🔍 Aplicando verificações de compliance...")
@@ -49,34 +84,33 @@ class StandaloneFraudDetector:
         
         # Regra 1: Itens proibidos (Seção 3)
         prohibited_items = self._check_prohibited_items(df)
-        fraudulent_transactions.extend(prohibited_items)
         print(f"  ✓ Itens proibidos: {len(prohibited_items)} violações")
         
         # Regra 2: Valores acima de alçada sem aprovação
         unauthorized_amounts = self._check_unauthorized_amounts(df)
-        fraudulent_transactions.extend(unauthorized_amounts)
         print(f"  ✓ Valores não autorizados: {len(unauthorized_amounts)} violações")
         
         # Regra 3: Smurfing (estruturação de pagamentos)
         smurfing_cases = self._check_smurfing(df)
-        fraudulent_transactions.extend(smurfing_cases)
         print(f"  ✓ Smurfing detectado: {len(smurfing_cases)} violações")
         
         # Regra 4: Locais restritos
         restricted_locations = self._check_restricted_locations(df)
-        fraudulent_transactions.extend(restricted_locations)
         print(f"  ✓ Locais restritos: {len(restricted_locations)} violações")
         
         # Regra 5: Categorias suspeitas
         suspicious_categories = self._check_suspicious_categories(df)
-        fraudulent_transactions.extend(suspicious_categories)
         print(f"  ✓ Categorias suspeitas: {len(suspicious_categories)} violações")
         
         elapsed = time.time() - start_time
         print(f"\n⏱️  Tempo de análise: {elapsed:.2f}s")
         
         # Remover duplicatas (uma transação pode violar múltiplas regras)
-        unique_frauds = self._deduplicate_frauds(fraudulent_transactions)
+        violations = pd.concat([
+            prohibited_items, unauthorized_amounts, smurfing_cases,
+            restricted_locations, suspicious_categories
+        ], ignore_index=True)
+        unique_frauds = self._deduplicate_frauds(violations)[VIOLATION_COLUMNS].to_dict('records')
         
         # Gerar relatório
         report = self._generate_report(unique_frauds, len(df))
@@ -88,187 +122,304 @@ class StandaloneFraudDetector:
             'report': report
         }
     
-    def _check_prohibited_items(self, df: pd.DataFrame) -> List[Dict]:
-        """Detecta compra de itens proibidos pela Seção 3"""
-        prohibited_keywords = [
-            'mágica', 'magic', 'karaokê', 'karaoke', 'algema', 'handcuff',
-            'corrente', 'chain', 'fumaça', 'smoke', 'pombo', 'pigeon',
-            'stripper', 'baralho marcado', 'discoteca', 'disco',
-            'arma', 'weapon', 'gun', 'airsoft', 'espada', 'sword', 'katana',
-            'ninja', 'nunchaku', 'spray de pimenta', 'pepper spray',
-            'camuflagem', 'camouflage', 'armadilha', 'trap',
-            'vela artesanal', 'candle', 'startup', 'rede social', 'social network',
-            'beterraba', 'beet', 'binóculo', 'binocular', 'vigilância', 'surveillance',
-            'walkie talkie', 'walkie-talkie'
-        ]
+    def _prepare_transactions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepara as colunas usadas pelas regras
         
-        violations = []
+        A descrição em minúsculas é calculada uma única vez para todas as regras, e
+        colunas de texto repetitivo viram category (comparações e joins sobre
+        códigos inteiros em vez de strings). As buscas por descrição das regras
+        por linha são feitas juntas, em uma única passada (_scan_descriptions).
         
-        for idx, row in df.iterrows():
-            description_lower = row['descricao'].lower()
+        Args:
+            df: DataFrame retornado por load_transactions
             
-            for keyword in prohibited_keywords:
-                if keyword in description_lower:
-                    violations.append({
-                        'transaction': row.to_dict(),
-                        'violation_type': 'ITEM_PROIBIDO',
-                        'severity': 9,
-                        'rule': 'Seção 3 - Lista Negra de Itens',
-                        'reason': f'Compra de item proibido detectada: "{keyword}"',
-                        'evidence': f'Descrição: {row["descricao"]}'
-                    })
-                    break
+        Returns:
+            Cópia com AUXILIARY_COLUMNS e dtypes category
+        """
+        descriptions_lower = df['descricao'].str.lower()
+        prepared = df.assign(
+            descricao_lower=descriptions_lower,
+            funcionario=df['funcionario'].astype('category')
+        )
+        if 'categoria' in prepared.columns:
+            prepared['categoria'] = prepared['categoria'].astype('category')
+        return prepared.join(self._scan_descriptions(descriptions_lower))
+    
+    def _scan_descriptions(self, descriptions_lower: pd.Series) -> pd.DataFrame:
+        """
+        Avalia em uma única passada todas as buscas de texto das regras por linha
         
-        return violations
+        Args:
+            descriptions_lower: Descrições em minúsculas
+            
+        Returns:
+            DataFrame (mesmo índice) com o item proibido e o local restrito
+            encontrados (ou None) e se há indicação de Purchase Order
+        """
+        results = [
+            (PROHIBITED_MATCHER.first_match(description),
+             RESTRICTED_MATCHER.first_match(description),
+             PO_PATTERN.search(description) is not None)
+            if isinstance(description, str) else (None, None, False)
+            for description in descriptions_lower
+        ]
+        return pd.DataFrame(
+            results,
+            columns=['_prohibited_item', '_restricted_location', '_has_po'],
+            index=descriptions_lower.index
+        ).astype({'_has_po': bool})
+    
+    def _transaction_records(self, df: pd.DataFrame) -> List[Dict]:
+        """Transações como dicts, sem as colunas auxiliares de _prepare_transactions"""
+        return df.drop(columns=AUXILIARY_COLUMNS).to_dict('records')
+    
+    def _violations(self, transactions: List[Dict], tx_ids, violation_type: str,
+                    severity: int, rule: str, reason, evidence) -> pd.DataFrame:
+        """
+        Monta o DataFrame de violações de uma regra (uma linha por violação)
+        
+        Args:
+            transactions: Transação (dict) de cada violação
+            tx_ids: ID usado na deduplicação de cada violação
+            violation_type: Tipo da violação
+            severity: Severidade (0-10)
+            rule: Regra da política violada
+            reason: Razão (texto único ou um por violação)
+            evidence: Evidência (texto único ou um por violação)
+            
+        Returns:
+            DataFrame com VIOLATION_COLUMNS e tx_id
+        """
+        return pd.DataFrame({
+            'transaction': transactions,
+            'violation_type': violation_type,
+            'severity': severity,
+            'rule': rule,
+            'reason': reason,
+            'evidence': evidence,
+            'tx_id': tx_ids
+        }, index=pd.RangeIndex(len(transactions)))
+    
+    def _format_values(self, values: pd.Series, spec: str) -> pd.Series:
+        """Formata números como texto (ex: '{:.2f}'), mantendo dtype de texto mesmo se vazio"""
+        return values.map(spec.format).astype(str)
     
-    def _check_unauthorized_amounts(self, df: pd.DataFrame) -> List[Dict]:
+    def _check_prohibited_items(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Detecta compra de itens proibidos pela Seção 3"""
+        keywords = df['_prohibited_item'].dropna().astype(str)
+        matched = df.loc[keywords.index]
+        
+        return self._violations(
+            self._transaction_records(matched),
+            matched['id_transacao'].to_numpy(),
+            violation_type='ITEM_PROIBIDO',
+            severity=9,
+            rule='Seção 3 - Lista Negra de Itens',
+            reason=('Compra de item proibido detectada: "' + keywords + '"').to_numpy(),
+            evidence=('Descrição: ' + matched['descricao']).to_numpy()
+        )
+    
+    def _check_unauthorized_amounts(self, df: pd.DataFrame) -> pd.DataFrame:
         """Detecta valores acima de alçada (Seção 1)"""
-        violations = []
-        
         # Valores acima de $500 requerem Purchase Order
         high_value_threshold = 500.00
         
-        for idx, row in df.iterrows():
-            if row['valor'] > high_value_threshold:
-                # Verificar se há indicação de PO na descrição
-                description_lower = row['descricao'].lower()
-                if 'po' not in description_lower and 'purchase order' not in description_lower and 'p.o.' not in description_lower:
-                    violations.append({
-                        'transaction': row.to_dict(),
-                        'violation_type': 'VALOR_NAO_AUTORIZADO',
-                        'severity': 7,
-                        'rule': 'Seção 1.3 - Grandes Despesas',
-                        'reason': f'Valor acima de ${high_value_threshold} sem evidência de Purchase Order',
-                        'evidence': f'Valor: ${row["valor"]:.2f}'
-                    })
-        
-        return violations
+        # Máscaras vetorizadas: valor alto e nenhuma indicação de PO na descrição
+        high_value = df['valor'].to_numpy() > high_value_threshold
+        has_po = df['_has_po'].to_numpy()
+        
+        matched = df.loc[high_value & ~has_po]
+        
+        return self._violations(
+            self._transaction_records(matched),
+            matched['id_transacao'].to_numpy(),
+            violation_type='VALOR_NAO_AUTORIZADO',
+            severity=7,
+            rule='Seção 1.3 - Grandes Despesas',
+            reason=f'Valor acima de ${high_value_threshold} sem evidência de Purchase Order',
+            evidence=('Valor: $' + self._format_values(matched['valor'], '{:.2f}')).to_numpy()
+        )
     
-    def _check_smurfing(self, df: pd.DataFrame) -> List[Dict]:
+    def _check_smurfing(self, df: pd.DataFrame) -> pd.DataFrame:
         """Detecta smurfing (estruturação) - Seção 1.3"""
-        violations = []
-        detected_pairs = set()  # Evitar duplicatas
-        
-        # Agrupar por funcionário e data
-        df_sorted = df.sort_values(['funcionario', 'data', 'descricao'])
+        # Só transações entre $300-$500 podem compor um par. Filtra antes de ordenar:
+        # a ordenação estável define a ordem dos pares (funcionário, dia, descrição),
+        # como na varredura original, e o join agrupa por (funcionário, dia) de uma vez
+        candidates = df.loc[
+            df['valor'].between(300, 500) & df['funcionario'].notna(),
+            ['id_transacao', 'funcionario', 'data', 'valor', 'descricao', 'descricao_lower']
+        ].sort_values(['funcionario', 'data', 'descricao'], kind='stable')
+        candidates = candidates.assign(_pos=np.arange(len(candidates)))
+        
+        # Palavras distintas de cada descrição em formato longo (_pos, _word), com
+        # cada palavra codificada como inteiro para que os joins comparem códigos
+        words = (
+            candidates.assign(_word=candidates['descricao_lower'].str.split())
+            [['_pos', '_word']]
+            .explode('_word')
+            .dropna()
+        )
+        words = words.assign(_word=pd.factorize(words['_word'])[0]).drop_duplicates()
+        word_counts = words.groupby('_pos').size()
+        candidates = candidates.assign(_n_words=candidates['_pos'].map(word_counts))
+        candidates = candidates[candidates['_n_words'].notna()]
+        
+        # Self-join: todos os pares de transações do mesmo funcionário no mesmo dia
+        pairs = candidates.merge(candidates, on=['funcionario', 'data'], suffixes=('_1', '_2'))
+        pairs = pairs[
+            (pairs['_pos_1'] < pairs['_pos_2']) &
+            (pairs['valor_1'] + pairs['valor_2'] > 500)
+        ]
         
-        for funcionario in df['funcionario'].unique():
-            func_df = df_sorted[df_sorted['funcionario'] == funcionario]
-            
-            # Verificar transações do mesmo dia com descrições similares
-            for data in func_df['data'].unique():
-                day_transactions = func_df[func_df['data'] == data]
-                
-                # Buscar pares de transações similares
-                transactions_list = list(day_transactions.iterrows())
-                
-                for i in range(len(transactions_list)):
-                    for j in range(i + 1, len(transactions_list)):
-                        idx1, row1 = transactions_list[i]
-                        idx2, row2 = transactions_list[j]
-                        
-                        # Criar chave única para o par
-                        pair_key = tuple(sorted([row1['id_transacao'], row2['id_transacao']]))
-                        if pair_key in detected_pairs:
-                            continue
-                        
-                        # Verificar similaridade de descrição
-                        desc1_words = set(row1['descricao'].lower().split())
-                        desc2_words = set(row2['descricao'].lower().split())
-                        
-                        if not desc1_words or not desc2_words:
-                            continue
-                        
-                        similarity = len(desc1_words & desc2_words) / len(desc1_words | desc2_words)
-                        
-                        # Se descrições muito similares e ambas entre $300-$500
-                        if similarity > 0.6 and 300 <= row1['valor'] <= 500 and 300 <= row2['valor'] <= 500:
-                            total = row1['valor'] + row2['valor']
-                            if total > 500:
-                                detected_pairs.add(pair_key)
-                                violations.append({
-                                    'transaction': {
-                                        'id_1': row1['id_transacao'],
-                                        'id_2': row2['id_transacao'],
-                                        'funcionario': funcionario,
-                                        'data': data,
-                                        'valor_total': total,
-                                        'valor_1': row1['valor'],
-                                        'valor_2': row2['valor'],
-                                        'descricao_1': row1['descricao'],
-                                        'descricao_2': row2['descricao'],
-                                        'similaridade': f"{similarity*100:.1f}%"
-                                    },
-                                    'violation_type': 'SMURFING',
-                                    'severity': 10,
-                                    'rule': 'Seção 1.3 - Proibição de Smurfing',
-                                    'reason': f'Possível estruturação: duas compras similares ({similarity*100:.0f}% similar) no mesmo dia totalizando ${total:.2f}',
-                                    'evidence': f'TX1: {row1["id_transacao"]} (${row1["valor"]:.2f}) + TX2: {row2["id_transacao"]} (${row2["valor"]:.2f})'
-                                })
-        
-        return violations
+        pairs = pairs.assign(similaridade=self._word_jaccard(pairs, words))
+        pairs = pairs[pairs['similaridade'] > 0.6]
+        
+        # Funcionários na ordem em que aparecem no arquivo; cada par só uma vez
+        employee_order = pd.Index(df['funcionario'].unique())
+        pairs = pairs.assign(_rank=employee_order.get_indexer(pairs['funcionario']))
+        pairs = pairs.sort_values(['_rank', '_pos_1', '_pos_2'])
+        pair_keys = pd.Series([
+            tuple(sorted(ids)) for ids in zip(pairs['id_transacao_1'], pairs['id_transacao_2'])
+        ], index=pairs.index, dtype=object)
+        pairs = pairs[~pair_keys.duplicated()]
+        
+        similarity = pairs['similaridade'] * 100
+        total = pairs['valor_1'] + pairs['valor_2']
+        transactions = pd.DataFrame({
+            'id_1': pairs['id_transacao_1'],
+            'id_2': pairs['id_transacao_2'],
+            'funcionario': pairs['funcionario'],
+            'data': pairs['data'],
+            'valor_total': total,
+            'valor_1': pairs['valor_1'],
+            'valor_2': pairs['valor_2'],
+            'descricao_1': pairs['descricao_1'],
+            'descricao_2': pairs['descricao_2'],
+            'similaridade': self._format_values(similarity, '{:.1f}%')
+        })
+        
+        return self._violations(
+            transactions.to_dict('records'),
+            pairs['id_transacao_1'].to_numpy(),
+            violation_type='SMURFING',
+            severity=10,
+            rule='Seção 1.3 - Proibição de Smurfing',
+            reason=(
+                'Possível estruturação: duas compras similares ('
+                + self._format_values(similarity, '{:.0f}')
+                + '% similar) no mesmo dia totalizando $' + self._format_values(total, '{:.2f}')
+            ).to_numpy(),
+            evidence=(
+                'TX1: ' + pairs['id_transacao_1'].astype(str)
+                + ' ($' + self._format_values(pairs['valor_1'], '{:.2f}')
+                + ') + TX2: ' + pairs['id_transacao_2'].astype(str)
+                + ' ($' + self._format_values(pairs['valor_2'], '{:.2f}') + ')'
+            ).to_numpy()
+        )
     
-    def _check_restricted_locations(self, df: pd.DataFrame) -> List[Dict]:
-        """Detecta uso de locais restritos - Seção 2.1"""
-        violations = []
+    def _word_jaccard(self, pairs: pd.DataFrame, words: pd.DataFrame) -> np.ndarray:
+        """
+        Similaridade de Jaccard entre as palavras das descrições de cada par
         
-        # Lista de locais restritos
-        restricted_locations = ['hooters', 'hooter']
+        A interseção é contada com joins sobre a tabela longa de palavras, sem
+        montar um set Python por descrição; a união sai dos tamanhos
+        (|A ∪ B| = |A| + |B| - |A ∩ B|).
         
-        for idx, row in df.iterrows():
-            description_lower = row['descricao'].lower()
+        Args:
+            pairs: Pares com _pos_1, _pos_2, _n_words_1 e _n_words_2
+            words: Palavras distintas (códigos inteiros) de cada candidata (colunas _pos, _word)
             
-            for location in restricted_locations:
-                if location in description_lower:
-                    violations.append({
-                        'transaction': row.to_dict(),
-                        'violation_type': 'LOCAL_RESTRITO',
-                        'severity': 6,
-                        'rule': 'Seção 2.1 - Locais Restritos',
-                        'reason': f'Refeição em local restrito: {location.title()} (banido da lista de reembolso)',
-                        'evidence': f'Descrição: {row["descricao"]}'
-                    })
-                    break
-        
-        return violations
+        Returns:
+            Array de similaridades (0-1), na ordem dos pares
+        """
+        shared = (
+            pairs[['_pos_1', '_pos_2']]
+            .merge(words.rename(columns={'_pos': '_pos_1'}), on='_pos_1')
+            .merge(words.rename(columns={'_pos': '_pos_2'}), on=['_pos_2', '_word'])
+            .groupby(['_pos_1', '_pos_2'])
+            .size()
+        )
+        intersection = shared.reindex(
+            pd.MultiIndex.from_arrays([pairs['_pos_1'], pairs['_pos_2']]), fill_value=0
+        ).to_numpy()
+        union = pairs['_n_words_1'].to_numpy() + pairs['_n_words_2'].to_numpy() - intersection
+        return intersection / union
     
-    def _check_suspicious_categories(self, df: pd.DataFrame) -> List[Dict]:
+    def _check_restricted_locations(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Detecta uso de locais restritos - Seção 2.1"""
+        locations = df['_restricted_location'].dropna().astype(str)
+        matched = df.loc[locations.index]
+        
+        return self._violations(
+            self._transaction_records(matched),
+            matched['id_transacao'].to_numpy(),
+            violation_type='LOCAL_RESTRITO',
+            severity=6,
+            rule='Seção 2.1 - Locais Restritos',
+            reason=(
+                'Refeição em local restrito: ' + locations.str.title()
+                + ' (banido da lista de reembolso)'
+            ).to_numpy(),
+            evidence=('Descrição: ' + matched['descricao']).to_numpy()
+        )
+    
+    def _check_suspicious_categories(self, df: pd.DataFrame) -> pd.DataFrame:
         """Detecta padrões suspeitos em categorias"""
-        violations = []
-        
         # Categoria "Segurança" é suspeita (pode indicar armamento)
         if 'categoria' in df.columns:
-            security_df = df[df['categoria'] == 'Segurança']
-            
-            for idx, row in security_df.iterrows():
-                violations.append({
-                    'transaction': row.to_dict(),
-                    'violation_type': 'CATEGORIA_SUSPEITA',
-                    'severity': 7,
-                    'rule': 'Seção 3.2 - Armamento e Defesa',
-                    'reason': 'Despesa categorizada como "Segurança" (possível armamento)',
-                    'evidence': f'Descrição: {row["descricao"]}, Valor: ${row["valor"]:.2f}'
-                })
-        
-        return violations
+            matched = df.loc[df['categoria'].eq('Segurança')]
+        else:
+            matched = df.iloc[:0]
+        
+        return self._violations(
+            self._transaction_records(matched),
+            matched['id_transacao'].to_numpy(),
+            violation_type='CATEGORIA_SUSPEITA',
+            severity=7,
+            rule='Seção 3.2 - Armamento e Defesa',
+            reason='Despesa categorizada como "Segurança" (possível armamento)',
+            evidence=(
+                'Descrição: ' + matched['descricao']
+                + ', Valor: $' + self._format_values(matched['valor'], '{:.2f}')
+            ).to_numpy()
+        )
     
-    def _deduplicate_frauds(self, frauds: List[Dict]) -> List[Dict]:
+    def _deduplicate_frauds(self, frauds: pd.DataFrame) -> pd.DataFrame:
         """Remove duplicatas mantendo a violação mais severa"""
-        # Agrupar por ID de transação
-        fraud_dict = {}
+        # Mais severa por transação (em empate, a primeira); ordem da primeira ocorrência
+        winners = frauds.sort_values('severity', ascending=False, kind='stable').drop_duplicates('tx_id')
+        first_seen = pd.Index(frauds['tx_id'].drop_duplicates()).get_indexer(winners['tx_id'])
+        return winners.iloc[np.argsort(first_seen, kind='stable')]
+    
+    def _most_severe(self, frauds: List[Dict], k: int) -> List[Dict]:
+        """
+        Seleciona as k violações mais severas sem ordenar a lista inteira
         
-        for fraud in frauds:
-            # Obter ID da transação
-            tx = fraud['transaction']
-            if isinstance(tx, dict):
-                tx_id = tx.get('id_transacao', tx.get('id_1', str(hash(str(tx)))))
-            else:
-                continue
+        Equivale a sorted(frauds, key=-severidade)[:k] (em empate, mantém a ordem
+        original), mas com seleção O(n) via np.partition.
+        
+        Args:
+            frauds: Violações
+            k: Quantidade a retornar
             
-            if tx_id not in fraud_dict or fraud['severity'] > fraud_dict[tx_id]['severity']:
-                fraud_dict[tx_id] = fraud
+        Returns:
+            Até k violações, da mais para a menos severa
+        """
+        k = min(k, len(frauds))
+        if k == 0:
+            return []
+        
+        severities = np.fromiter((f['severity'] for f in frauds), dtype=np.int8, count=len(frauds))
         
-        return list(fraud_dict.values())
+        # k-ésima maior severidade: entram todas acima dela e os primeiros empates
+        threshold = np.partition(severities, len(severities) - k)[len(severities) - k]
+        above = np.flatnonzero(severities > threshold)
+        ties = np.flatnonzero(severities == threshold)[:k - len(above)]
+        chosen = np.concatenate([above, ties])
+        
+        # Ordenação final só dos k escolhidos: severidade decrescente, depois posição
+        return [frauds[i] for i in chosen[np.lexsort((chosen, -severities[chosen]))]]
     
     def _generate_report(self, frauds: List[Dict], total: int) -> str:
         """Gera relatório consolidado"""
@@ -296,7 +447,8 @@ Recomendação: Nenhuma ação necessária.
         
         high_severity = [f for f in frauds if f['severity'] >= 8]
         
-        report = f"""
+        # Partes do relatório, unidas uma única vez no final
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════════════════╗
 ║         RELATÓRIO DE AUDITORIA - FRAUDES STANDALONE                  ║
 ╚══════════════════════════════════════════════════════════════════════╝
@@ -309,43 +461,40 @@ ESTATÍSTICAS:
 - Alta severidade (≥8): {len(high_severity)}
 
 VIOLAÇÕES POR TIPO:
-"""
+"""]
         
         for vtype, items in sorted(by_type.items(), key=lambda x: -len(x[1])):
-            report += f"  • {vtype}: {len(items)} caso(s)\n"
+            parts.append(f"  • {vtype}: {len(items)} caso(s)\n")
         
-        report += "\n" + "─"*70 + "\n"
-        report += "TOP 10 VIOLAÇÕES MAIS SEVERAS:\n"
-        report += "─"*70 + "\n\n"
+        parts.append("\n" + "─"*70 + "\n")
+        parts.append("TOP 10 VIOLAÇÕES MAIS SEVERAS:\n")
+        parts.append("─"*70 + "\n\n")
         
-        # Ordenar por severidade
-        sorted_frauds = sorted(frauds, key=lambda x: -x['severity'])
-        
-        for i, fraud in enumerate(sorted_frauds[:10], 1):
+        for i, fraud in enumerate(self._most_severe(frauds, 10), 1):
             tx = fraud['transaction']
-            report += f"[{i}] {fraud['violation_type']} - Severidade: {fraud['severity']}/10\n"
-            report += f"    Regra: {fraud['rule']}\n"
-            report += f"    Razão: {fraud['reason']}\n"
-            report += f"    {fraud['evidence']}\n"
+            parts.append(f"[{i}] {fraud['violation_type']} - Severidade: {fraud['severity']}/10\n")
+            parts.append(f"    Regra: {fraud['rule']}\n")
+            parts.append(f"    Razão: {fraud['reason']}\n")
+            parts.append(f"    {fraud['evidence']}\n")
             
             if isinstance(tx, dict):
                 if 'id_transacao' in tx:
-                    report += f"    ID: {tx['id_transacao']} | Funcionário: {tx.get('funcionario', 'N/A')}\n"
+                    parts.append(f"    ID: {tx['id_transacao']} | Funcionário: {tx.get('funcionario', 'N/A')}\n")
                 elif 'id_1' in tx:
-                    report += f"    IDs: {tx['id_1']} + {tx['id_2']} | Funcionário: {tx.get('funcionario', 'N/A')}\n"
-                    report += f"    Similaridade: {tx.get('similaridade', 'N/A')}\n"
-            report += "\n"
+                    parts.append(f"    IDs: {tx['id_1']} + {tx['id_2']} | Funcionário: {tx.get('funcionario', 'N/A')}\n")
+                    parts.append(f"    Similaridade: {tx.get('similaridade', 'N/A')}\n")
+            parts.append("\n")
         
-        report += f"""
+        parts.append(f"""
 {'─'*70}
 CONCLUSÃO:
 ⚠️  {len(frauds)} violação(ões) de compliance detectada(s)
 ⚠️  Ação recomendada: Revisão com RH e possível ação disciplinar
 
 Relatório gerado pelo Sistema de Auditoria Dunder Mifflin
-"""
+""")
         
-        return report
+        return "".join(parts)
 
 
 def main():
@@ -374,43 +523,57 @@ def main():
     if results['fraudulent_transactions']:
         print("\n💾 Salvando detalhes das violações...")
         
-        fraud_details = []
-        for fraud in results['fraudulent_transactions']:
-            tx = fraud['transaction']
-            if isinstance(tx, dict):
+        # Escrever linha a linha, sem montar uma tabela intermediária em memória
+        output_path = 'fraudes_standalone.csv'
+        fieldnames = [
+            'id_transacao', 'funcionario', 'data', 'valor', 'descricao',
+            'violation_type', 'severity', 'rule', 'reason'
+        ]
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+            writer.writeheader()
+            
+            for fraud in results['fraudulent_transactions']:
+                tx = fraud['transaction']
+                if not isinstance(tx, dict):
+                    continue
+                
+                violation = {
+                    'violation_type': fraud['violation_type'],
+                    'severity': fraud['severity'],
+                    'rule': fraud['rule'],
+                    'reason': fraud['reason']
+                }
                 # Transação simples
                 if 'id_transacao' in tx:
-                    fraud_details.append({
+                    writer.writerow({
                         'id_transacao': tx['id_transacao'],
                         'funcionario': tx.get('funcionario', 'N/A'),
-                        'data': tx.get('data', 'N/A'),
+                        'data': _csv_date(tx.get('data', 'N/A')),
                         'valor': tx.get('valor', 0),
                         'descricao': tx.get('descricao', 'N/A'),
-                        'violation_type': fraud['violation_type'],
-                        'severity': fraud['severity'],
-                        'rule': fraud['rule'],
-                        'reason': fraud['reason']
+                        **violation
                     })
                 # Smurfing (par de transações)
                 elif 'id_1' in tx:
-                    fraud_details.append({
+                    writer.writerow({
                         'id_transacao': f"{tx['id_1']} + {tx['id_2']}",
                         'funcionario': tx.get('funcionario', 'N/A'),
-                        'data': tx.get('data', 'N/A'),
+                        'data': _csv_date(tx.get('data', 'N/A')),
                         'valor': tx.get('valor_total', 0),
                         'descricao': f"{tx.get('descricao_1', '')} | {tx.get('descricao_2', '')}",
-                        'violation_type': fraud['violation_type'],
-                        'severity': fraud['severity'],
-                        'rule': fraud['rule'],
-                        'reason': fraud['reason']
+                        **violation
                     })
         
-        if fraud_details:
-            import pandas as pd
-            df_frauds = pd.DataFrame(fraud_details)
-            output_path = 'fraudes_standalone.csv'
-            df_frauds.to_csv(output_path, index=False, encoding='utf-8')
-            print(f"✓ Arquivo salvo: {output_path}")
+        print(f"✓ Arquivo salvo: {output_path}")
+
+
+def _csv_date(value) -> str:
+    """Data da transação no CSV: só AAAA-MM-DD quando não há horário"""
+    if isinstance(value, pd.Timestamp) and value == value.normalize():
+        return value.strftime('%Y-%m-%d')
+    return value
 
 
 if __name__ == "__main__":
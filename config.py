@@ -41,10 +41,41 @@ if LLM_PROVIDER == "groq":
 else:
     raise ValueError(f"Provider não suportado: {LLM_PROVIDER}. Use 'groq'")
 
+# Modelo barato para a triagem em cascata do detector de fraudes contextuais: decide
+# primeiro se há indício; só os positivos vão ao modelo principal. Vazio = desativado.
+CHEAP_MODEL_NAME = os.getenv("CHEAP_MODEL_NAME", "")
+
 # Configurações do modelo
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "4096"))
 
+# Seed enviada nas chamadas de baixa temperatura (até LLM_CACHE_MAX_TEMPERATURE), para
+# respostas reprodutíveis entre execuções. Vazio = não enviar seed.
+LLM_SEED = int(os.getenv("LLM_SEED", "0")) if os.getenv("LLM_SEED", "0") else None
+
+# Concorrência: número máximo de chamadas simultâneas ao LLM
+# (ajuste conforme o limite de requisições por minuto da sua conta Groq)
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "8"))
+
+# HTTP/2 nas chamadas ao provider (requer: pip install "httpx[http2]")
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Emails analisados por chamada ao LLM no detector de conspiração (1 = um por chamada)
+CONSPIRACY_BATCH_SIZE = int(os.getenv("CONSPIRACY_BATCH_SIZE", "10"))
+
+# Batch API do provider no detector de fraudes contextuais: as análises são enviadas
+# como um job assíncrono (mais barato, porém pode levar minutos ou horas)
+LLM_BATCH_API = os.getenv("LLM_BATCH_API", "false").lower() in ("1", "true", "yes")
+LLM_BATCH_COMPLETION_WINDOW = os.getenv("LLM_BATCH_COMPLETION_WINDOW", "24h")
+LLM_BATCH_POLL_INTERVAL = float(os.getenv("LLM_BATCH_POLL_INTERVAL", "10"))
+
+# Triagem lexical opcional no detector de conspiração (TF-IDF + regressão logística,
+# treinada com `python -m agents.conspiracy_agent --train-triage`). Emails com
+# probabilidade de serem benignos acima do limiar não são enviados ao LLM.
+# Caminho vazio = triagem desativada.
+CONSPIRACY_TRIAGE_MODEL_PATH = os.getenv("CONSPIRACY_TRIAGE_MODEL_PATH", "")
+CONSPIRACY_TRIAGE_THRESHOLD = float(os.getenv("CONSPIRACY_TRIAGE_THRESHOLD", "0.8"))
+
 # ============================================================================
 # CAMINHOS DOS ARQUIVOS
 # ============================================================================
@@ -62,20 +93,61 @@ EMAILS_PATH = DATA_DIR / "emails.txt"
 CHROMA_PERSIST_DIR = BASE_DIR / "chroma_db"
 COLLECTION_NAME = "compliance_policy"
 
+# Distância máxima (L2² entre embeddings normalizados, 0-4) do chunk mais próximo
+# para a pergunta ser enviada ao LLM. Acima disso o RAG responde que não encontrou
+# a informação sem chamar o LLM. 0 = desativado (padrão); ajuste o valor medindo as
+# distâncias de perguntas válidas sobre a política antes de ativar.
+RAG_MAX_DISTANCE = float(os.getenv("RAG_MAX_DISTANCE", "0"))
+
+# Cache semântico do chatbot: perguntas com similaridade de cosseno acima do limiar
+# (ex: 0.92) com uma pergunta já respondida reutilizam a resposta. 0 = desativado.
+RAG_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", "0"))
+
+# Servidor ChromaDB opcional (ex: `chroma run --path chroma_db`).
+# Se CHROMA_HOST estiver vazio, o ChromaDB roda embutido no processo.
+CHROMA_HOST = os.getenv("CHROMA_HOST", "")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+
+# Pasta com o all-MiniLM-L6-v2 quantizado em int8 (gerado com `python -m utils.embeddings`).
+# Vazio = embedder ONNX FP32 padrão do ChromaDB.
+EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH", "")
+
+# ============================================================================
+# CACHE DE RESPOSTAS DO LLM
+# ============================================================================
+
+CACHE_DIR = BASE_DIR / ".cache"
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Só respostas (quase) determinísticas são cacheadas: chamadas com temperatura
+# acima deste valor sempre vão ao provider (0.1 cobre as análises em JSON dos agentes)
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.1"))
+
+# Camada LRU em memória na frente do SQLite (0 desativa); TTL em segundos
+LLM_MEMORY_CACHE_SIZE = int(os.getenv("LLM_MEMORY_CACHE_SIZE", "500"))
+LLM_MEMORY_CACHE_TTL = float(os.getenv("LLM_MEMORY_CACHE_TTL", "3600"))
+
 # ============================================================================
 # VALIDAÇÕES
 # ============================================================================
 
-if LLM_PROVIDER == "groq":
-    if not GROQ_API_KEY:
-        raise ValueError(
-            "\n❌ GROQ_API_KEY não encontrada!\n\n"
-            "Configure no arquivo .env:\n"
-            "  LLM_PROVIDER=groq\n"
-            "  GROQ_API_KEY=gsk_sua_chave_aqui\n\n"
-            "Obtenha sua chave GRATUITA em: https://console.groq.com/keys\n"
-        )
-    print("✓ Groq API Key configurada")
+def check_api_key():
+    """
+    Verifica se a chave de API do provider está configurada
+    
+    Chamada por print_config_info na inicialização (e não no import do módulo),
+    para que importar config em testes ou serviços não falhe nem imprima nada.
+    """
+    if LLM_PROVIDER == "groq":
+        if not GROQ_API_KEY:
+            raise ValueError(
+                "\n❌ GROQ_API_KEY não encontrada!\n\n"
+                "Configure no arquivo .env:\n"
+                "  LLM_PROVIDER=groq\n"
+                "  GROQ_API_KEY=gsk_sua_chave_aqui\n\n"
+                "Obtenha sua chave GRATUITA em: https://console.groq.com/keys\n"
+            )
+        print("✓ Groq API Key configurada")
 
 # ============================================================================
 # INFORMAÇÕES DE CONFIGURAÇÃO
@@ -83,6 +155,7 @@ if LLM_PROVIDER == "groq":
 
 def print_config_info():
     """Imprime informações de configuração na inicialização"""
+    check_api_key()
     print()
     print("╔" + "═"*70 + "╗")
     print("║" + " "*25 + "CONFIGURAÇÃO DO SISTEMA" + " "*22 + "║")
@@ -141,14 +214,35 @@ __all__ = [
     'LLM_PROVIDER',
     'GROQ_API_KEY',
     'MODEL_NAME',
+    'CHEAP_MODEL_NAME',
     'TEMPERATURE',
     'MAX_TOKENS',
+    'LLM_SEED',
+    'LLM_MAX_WORKERS',
+    'LLM_HTTP2',
+    'CONSPIRACY_BATCH_SIZE',
+    'LLM_BATCH_API',
+    'LLM_BATCH_COMPLETION_WINDOW',
+    'LLM_BATCH_POLL_INTERVAL',
+    'CONSPIRACY_TRIAGE_MODEL_PATH',
+    'CONSPIRACY_TRIAGE_THRESHOLD',
     'COMPLIANCE_POLICY_PATH',
     'TRANSACTIONS_PATH',
     'EMAILS_PATH',
     'CHROMA_PERSIST_DIR',
     'COLLECTION_NAME',
+    'RAG_MAX_DISTANCE',
+    'RAG_SEMANTIC_CACHE_THRESHOLD',
+    'CHROMA_HOST',
+    'CHROMA_PORT',
+    'EMBEDDING_ONNX_PATH',
+    'CACHE_DIR',
+    'LLM_CACHE_ENABLED',
+    'LLM_CACHE_MAX_TEMPERATURE',
+    'LLM_MEMORY_CACHE_SIZE',
+    'LLM_MEMORY_CACHE_TTL',
     'print_config_info',
+    'check_api_key',
     'get_model_info',
     'check_data_files',
     'MODELS'
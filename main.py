@@ -5,8 +5,14 @@ Este é o ponto de entrada principal do sistema.
 Permite executar cada agente individualmente ou todos juntos.
 """
 
+import argparse
+import contextvars
+import io
 import sys
+import threading
 import time
+from concurrent.futures import as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 import csv
 
@@ -14,28 +20,58 @@ import csv
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
+from utils.concurrency import ContextThreadPoolExecutor
+from utils.llm_adapter import get_adapter, close_adapter
+
+# Buffer de saída do agente em execução (propagado às threads internas dos agentes,
+# que usam ContextThreadPoolExecutor)
+_output_buffer: contextvars.ContextVar = contextvars.ContextVar('output_buffer', default=None)
+
+
+class _ContextStdout(io.TextIOBase):
+    """
+    stdout que envia a saída para o buffer do agente no contexto de quem escreve
+
+    redirect_stdout troca sys.stdout do processo inteiro, então agentes rodando em
+    paralelo não podem cada um redirecionar para o seu StringIO; este proxy é
+    instalado uma única vez e escolhe o destino pela variável de contexto
+    _output_buffer, que acompanha as tarefas submetidas pelo agente aos seus pools.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def write(self, text):
+        buffer = _output_buffer.get()
+        return (buffer if buffer is not None else self._fallback).write(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+
+# Textos fixos do menu, montados uma única vez
+BANNER = "\n" + "=" * 80 + "\n" + " " * 20 + "SISTEMA DE AUDITORIA DUNDER MIFFLIN\n" + "=" * 80 + "\n\n"
+
+MENU = """Escolha um agente para executar:
+
+  [1] Agente 1: RAG de Compliance (Chatbot)
+  [2] Agente 2: Detector de Teorias da Conspiração
+  [3] Agente 3A: Detector de Fraudes Standalone
+  [4] Agente 3B: Detector de Fraudes Contextuais
+  [5] Executar TODOS os agentes
+  [0] Sair
+
+"""
 
 
 def print_banner():
     """Imprime banner do sistema"""
-    print()
-    print("=" * 80)
-    print(" " * 20 + "SISTEMA DE AUDITORIA DUNDER MIFFLIN")
-    print("=" * 80)
-    print()
+    sys.stdout.write(BANNER)
 
 
 def print_menu():
     """Imprime menu de opções"""
-    print("Escolha um agente para executar:")
-    print()
-    print("  [1] Agente 1: RAG de Compliance (Chatbot)")
-    print("  [2] Agente 2: Detector de Teorias da Conspiração")
-    print("  [3] Agente 3A: Detector de Fraudes Standalone")
-    print("  [4] Agente 3B: Detector de Fraudes Contextuais")
-    print("  [5] Executar TODOS os agentes")
-    print("  [0] Sair")
-    print()
+    sys.stdout.write(MENU)
 
 
 def run_compliance_rag():
@@ -47,7 +83,7 @@ def run_compliance_rag():
         print("AGENTE 1: RAG DE COMPLIANCE")
         print("=" * 80)
         
-        agent = ComplianceRAGAgent()
+        agent = ComplianceRAGAgent(llm=get_adapter())
         
         # Modo interativo
         print("\nChatbot de Compliance iniciado!")
@@ -62,8 +98,11 @@ def run_compliance_rag():
             if not pergunta:
                 continue
             
-            resposta = agent.query(pergunta)
-            print(f"\nAssistente: {resposta}\n")
+            # Resposta exibida à medida que o modelo gera os tokens
+            print("\nAssistente: ", end="", flush=True)
+            for chunk in agent.query_stream(pergunta):
+                print(chunk, end="", flush=True)
+            print("\n")
         
         print("\n✓ Agente 1 finalizado\n")
         
@@ -83,7 +122,7 @@ def run_conspiracy_detector():
         print("AGENTE 2: DETECTOR DE TEORIAS DA CONSPIRAÇÃO")
         print("=" * 80)
         
-        detector = ConspiracyDetectionAgent()
+        detector = ConspiracyDetectionAgent(llm=get_adapter())
         
         start_time = time.time()
         results = detector.analyze_emails()
@@ -117,7 +156,7 @@ def run_standalone_fraud_detector():
         print("AGENTE 3A: DETECTOR DE FRAUDES STANDALONE")
         print("=" * 80)
         
-        detector = StandaloneFraudDetector()
+        detector = StandaloneFraudDetector(llm=get_adapter())
         
         start_time = time.time()
         results = detector.analyze_transactions()
@@ -150,7 +189,7 @@ def run_contextual_fraud_detector():
         print("AGENTE 3B: DETECTOR DE FRAUDES CONTEXTUAIS")
         print("=" * 80)
         
-        detector = ContextualFraudDetector()
+        detector = ContextualFraudDetector(llm=get_adapter())
         
         start_time = time.time()
         results = detector.analyze_contextual_frauds()
@@ -172,8 +211,12 @@ def run_contextual_fraud_detector():
     except Exception as e:
         print(f"\n❌ Erro ao executar Agente 3B: {e}\n")
 
+# Buffer de escrita dos CSVs de resultado (menos chamadas de I/O por linha)
+CSV_BUFFER_SIZE = 1 << 20
+
+
 def save_suspicious_emails_csv(suspicious_emails, filename="emails_suspeitos.csv"):
-    with open(filename, mode="w", newline="", encoding="utf-8") as f:
+    with open(filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as f:
         writer = csv.writer(f)
 
         writer.writerow([
@@ -181,24 +224,23 @@ def save_suspicious_emails_csv(suspicious_emails, filename="emails_suspeitos.csv
             "is_suspicious", "severity", "reasoning", "evidence_quotes"
         ])
 
-        for item in suspicious_emails:
-            email = item["email"]
-            analysis = item["analysis"]
-
-            writer.writerow([
-                email.get("de"),
-                email.get("para"),
-                email.get("data"),
-                email.get("assunto"),
-                analysis.get("is_suspicious"),
-                analysis.get("severity"),
-                analysis.get("reasoning"),
-                "; ".join(analysis.get("evidence_quotes", []))
-            ])
+        writer.writerows(
+            (
+                item["email"].get("de"),
+                item["email"].get("para"),
+                item["email"].get("data"),
+                item["email"].get("assunto"),
+                item["analysis"].get("is_suspicious"),
+                item["analysis"].get("severity"),
+                item["analysis"].get("reasoning"),
+                "; ".join(item["analysis"].get("evidence_quotes", []))
+            )
+            for item in suspicious_emails
+        )
 
 
 def save_standalone_frauds_csv(fraudulent_transactions, filename="fraudes_standalone.csv"):
-    with open(filename, mode="w", newline="", encoding="utf-8") as f:
+    with open(filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as f:
         writer = csv.writer(f)
 
         if not fraudulent_transactions:
@@ -206,42 +248,54 @@ def save_standalone_frauds_csv(fraudulent_transactions, filename="fraudes_standa
 
         # Cabeçalho dinâmico baseado nas chaves
         writer.writerow(fraudulent_transactions[0].keys())
-
-        for tx in fraudulent_transactions:
-            writer.writerow(tx.values())
+        writer.writerows(tx.values() for tx in fraudulent_transactions)
 
 
 def save_contextual_frauds_csv(contextual_frauds, filename="fraudes_contextuais.csv"):
-    with open(filename, mode="w", newline="", encoding="utf-8") as f:
+    with open(filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as f:
         writer = csv.writer(f)
 
         if not contextual_frauds:
             return
 
         writer.writerow(contextual_frauds[0].keys())
-
-        for fraud in contextual_frauds:
-            writer.writerow(fraud.values())
+        writer.writerows(fraud.values() for fraud in contextual_frauds)
 
 def run_all_agents():
-    """Executa todos os agentes em sequência"""
+    """Executa todos os agentes em paralelo (cada um espera principalmente pelo LLM)"""
     print("\n" + "=" * 80)
     print("EXECUTANDO TODOS OS AGENTES")
     print("=" * 80)
     
     total_start = time.time()
     
-    # Agente 2: Conspiração
-    print("\n[1/3] Executando Agente 2: Detector de Teorias da Conspiração...")
-    run_conspiracy_detector()
+    agents = [
+        ("Agente 2: Detector de Teorias da Conspiração", run_conspiracy_detector),
+        ("Agente 3A: Detector de Fraudes Standalone", run_standalone_fraud_detector),
+        ("Agente 3B: Detector de Fraudes Contextuais", run_contextual_fraud_detector),
+    ]
     
-    # Agente 3A: Fraudes Standalone
-    print("\n[2/3] Executando Agente 3A: Detector de Fraudes Standalone...")
-    run_standalone_fraud_detector()
+    print(f"\nExecutando {len(agents)} agentes em paralelo...")
     
-    # Agente 3B: Fraudes Contextuais
-    print("\n[3/3] Executando Agente 3B: Detector de Fraudes Contextuais...")
-    run_contextual_fraud_detector()
+    # Saída de cada agente fica em buffer e é impressa inteira quando ele termina
+    stdout = _ContextStdout(sys.stdout)
+    print_lock = threading.Lock()
+    
+    def run_buffered(run_agent):
+        # Cada tarefa roda numa cópia do contexto: o buffer não vaza para as demais
+        buffer = io.StringIO()
+        _output_buffer.set(buffer)
+        run_agent()
+        return buffer.getvalue()
+    
+    with redirect_stdout(stdout), ContextThreadPoolExecutor(max_workers=len(agents)) as executor:
+        futures = {executor.submit(run_buffered, run_agent): name for name, run_agent in agents}
+        
+        for done, future in enumerate(as_completed(futures), start=1):
+            output = future.result()
+            with print_lock:
+                print(f"\n[{done}/{len(agents)}] {futures[future]} concluído")
+                print(output, end="")
     
     total_elapsed = time.time() - total_start
     
@@ -255,8 +309,33 @@ def run_all_agents():
     print()
 
 
+# Opção do menu -> agente
+MENU_ACTIONS = {
+    '1': run_compliance_rag,
+    '2': run_conspiracy_detector,
+    '3': run_standalone_fraud_detector,
+    '4': run_contextual_fraud_detector,
+    '5': run_all_agents,
+}
+
+
+def parse_args():
+    """Lê argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description="Sistema de Auditoria Dunder Mifflin")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Desativa o cache de respostas do LLM (útil para benchmarks)"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Função principal"""
+    args = parse_args()
+    if args.no_cache:
+        config.LLM_CACHE_ENABLED = False
+    
     print_banner()
     config.print_config_info()
     
@@ -279,21 +358,9 @@ def main():
                 print("\n👋 Encerrando sistema...\n")
                 break
             
-            elif choice == '1':
-                run_compliance_rag()
-            
-            elif choice == '2':
-                run_conspiracy_detector()
-            
-            elif choice == '3':
-                run_standalone_fraud_detector()
-            
-            elif choice == '4':
-                run_contextual_fraud_detector()
-            
-            elif choice == '5':
-                run_all_agents()
-            
+            action = MENU_ACTIONS.get(choice)
+            if action is not None:
+                action()
             else:
                 print("\n❌ Opção inválida. Escolha um número de 0 a 5.\n")
         
@@ -305,6 +372,8 @@ def main():
             print(f"\n❌ Erro inesperado: {e}\n")
             import traceback
             traceback.print_exc()
+    
+    close_adapter()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+"""
+Pool de threads que propaga o contexto (contextvars) de quem submete a tarefa
+
+Com o ThreadPoolExecutor padrão, cada thread do pool roda no próprio contexto e
+perde variáveis de contexto definidas por quem submeteu a tarefa (ex: o buffer
+de saída de cada agente em main.run_all_agents).
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor em que cada tarefa roda numa cópia do contexto do momento do submit
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
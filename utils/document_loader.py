@@ -1,15 +1,66 @@
 """
 Utilitários para carregar e processar documentos do sistema de auditoria
 """
+import glob
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
 import pandas as pd
+from email.utils import getaddresses
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Iterator
+import config
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
+# Linhas por bloco na leitura do CSV de transações
+TRANSACTIONS_CHUNK_SIZE = 50_000
+
+# Versão do formato dos arquivos auxiliares de _cached: incrementar sempre que o
+# parse ou a conversão de tipos mudar (_parse_emails, _coerce_transactions,
+# _add_search_fields, split_text_for_rag...), para descartar caches antigos
+CACHE_FORMAT_VERSION = 5
+
+# Um lock por origem/tipo de _cached: agentes em paralelo carregando o mesmo
+# arquivo esperam o primeiro gerar o cache em vez de ler um arquivo incompleto
+_cache_locks: Dict[str, threading.Lock] = {}
+_cache_locks_guard = threading.Lock()
+
+# Colunas obrigatórias do CSV de transações
+TRANSACTION_COLUMNS = ['id_transacao', 'funcionario', 'data', 'valor', 'descricao']
+
+# Formatos de data reconhecidos no CSV de transações (padrão -> formato strptime).
+# Datas com barra são lidas como dia/mês/ano (padrão brasileiro): "02/01/2008" é 2 de janeiro.
+DATE_FORMATS = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '%Y-%m-%d'),
+    (re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}'), '%Y-%m-%d %H:%M'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}'), 'ISO8601'),
+    (re.compile(r'\d{2}/\d{2}/\d{4}'), '%d/%m/%Y'),
+]
+
+# Quantas datas são inspecionadas para detectar o formato
+DATE_FORMAT_SAMPLE_SIZE = 100
+
+# Fração mínima das datas preenchidas que o formato detectado precisa converter;
+# abaixo disso a coluna inteira é convertida elemento a elemento (format='mixed')
+DATE_FORMAT_MIN_MATCH = 0.99
 
 
 def load_compliance_policy(filepath: str | Path) -> str:
     """
     Carrega a política de compliance
     
+    O conteúdo fica em memória (por processo) e é relido apenas se o arquivo
+    for modificado.
+    
     Args:
         filepath: Caminho para o arquivo da política
         
@@ -21,6 +72,12 @@ def load_compliance_policy(filepath: str | Path) -> str:
     if not filepath.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
     
+    return _load_compliance_policy_cached(str(filepath.resolve()), filepath.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_compliance_policy_cached(filepath: str, mtime_ns: int) -> str:
+    """Leitura da política memoizada por (caminho, data de modificação)"""
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
@@ -31,41 +88,260 @@ def load_transactions(filepath: str | Path) -> pd.DataFrame:
     """
     Carrega transações bancárias do CSV
     
+    O resultado do parse fica em memória (por processo) e em um arquivo auxiliar
+    em config.CACHE_DIR (ver _cached); ambos são invalidados quando o CSV é modificado.
+    
     Args:
         filepath: Caminho para o arquivo CSV
         
     Returns:
-        DataFrame com as transações
+        DataFrame com as transações (cópia, pode ser modificada pelo chamador)
     """
     filepath = Path(filepath)
     
     if not filepath.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
     
-    # Carregar CSV
-    df = pd.read_csv(filepath, encoding='utf-8')
+    stat = filepath.stat()
+    return _load_transactions_cached(str(filepath.resolve()), stat.st_mtime_ns, stat.st_size).copy()
+
+
+@lru_cache(maxsize=4)
+def _load_transactions_cached(filepath: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """Parse do CSV memoizado por (caminho, data de modificação, tamanho)"""
+    filepath = Path(filepath)
+    return _cached(filepath, 'transactions', lambda: _parse_transactions(filepath))
+
+
+def _cached(source: Path, kind: str, build: Callable[[], Any]) -> Any:
+    """
+    Resultado de build() guardado em um arquivo auxiliar (pickle) em config.CACHE_DIR
     
-    # Validar colunas necessárias
-    required_columns = ['id_transacao', 'funcionario', 'data', 'valor', 'descricao']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    O nome do arquivo leva o caminho da origem (hash), a versão do formato
+    (CACHE_FORMAT_VERSION), a data de modificação e o tamanho da origem, então
+    qualquer alteração na origem ou no parse invalida o cache.
     
+    Args:
+        source: Arquivo de origem
+        kind: Identifica o que foi derivado da origem (ex: 'emails')
+        build: Função que gera o resultado a partir da origem
+        
+    Returns:
+        Resultado lido do cache ou recém-gerado
+    """
+    path_hash = hashlib.sha256(str(source.resolve()).encode('utf-8')).hexdigest()[:12]
+    prefix = f"{source.stem}-{path_hash}.{kind}"
+    stat = source.stat()
+    sidecar = config.CACHE_DIR / (
+        f"{prefix}.v{CACHE_FORMAT_VERSION}.{stat.st_mtime_ns}-{stat.st_size}.pkl"
+    )
+    
+    with _cache_locks_guard:
+        lock = _cache_locks.setdefault(prefix, threading.Lock())
+    
+    with lock:
+        if sidecar.exists():
+            try:
+                with open(sidecar, 'rb') as f:
+                    return pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, OSError) as e:
+                # Arquivo corrompido ou de outra versão das bibliotecas: descartar e refazer
+                print(f"⚠️  Cache de {source.name} inválido ({e.__class__.__name__}), recriando...")
+                sidecar.unlink(missing_ok=True)
+        
+        result = build()
+        
+        # Gravar em arquivo temporário e renomear (atômico): um leitor nunca vê o
+        # arquivo pela metade. Versões anteriores da mesma origem são removidas.
+        try:
+            config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            for stale in config.CACHE_DIR.glob(f"{glob.escape(prefix)}.*.pkl"):
+                stale.unlink(missing_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=config.CACHE_DIR, suffix='.tmp',
+                                             delete=False) as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, sidecar)
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar o cache de {source.name}: {e}")
+        
+        return result
+
+
+def _parse_transactions(filepath: Path) -> pd.DataFrame:
+    """Lê e valida o CSV de transações (com o leitor multithread do pyarrow, se instalado)"""
+    if pa is None:
+        return pd.concat(iter_transactions(filepath))
+    
+    # 'valor' e 'data' chegam como texto (células vazias como nulo, igual ao pandas)
+    # para que a conversão abaixo seja a mesma da leitura em blocos: um valor
+    # inválido vira NaN e descarta só a sua linha, em vez de abortar a leitura
+    table = pacsv.read_csv(
+        filepath,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+        convert_options=pacsv.ConvertOptions(
+            column_types={'valor': pa.string(), 'data': pa.string()},
+            strings_can_be_null=True
+        )
+    )
+    
+    columns = set(table.schema.names)
+    missing_columns = [col for col in TRANSACTION_COLUMNS if col not in columns]
     if missing_columns:
         raise ValueError(f"Colunas faltando no CSV: {missing_columns}")
     
-    # Converter tipos
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    return _coerce_transactions(df, _detect_date_format(df['data']))
+
+
+def iter_transactions(filepath: str | Path,
+                      chunksize: int = TRANSACTIONS_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Lê o CSV de transações em blocos, já validados e com tipos convertidos
+    
+    A conversão de tipos e a remoção de linhas inválidas são feitas bloco a bloco,
+    sem manter o CSV inteiro em texto na memória. O índice segue a numeração
+    das linhas do arquivo, como em uma leitura única.
+    
+    Args:
+        filepath: Caminho para o arquivo CSV
+        chunksize: Número de linhas por bloco
+        
+    Yields:
+        DataFrame de cada bloco (ao menos um, possivelmente vazio)
+    """
+    # Formato de data detectado no primeiro bloco e usado no arquivo inteiro
+    date_format = None
+    
+    for position, chunk in enumerate(pd.read_csv(filepath, encoding='utf-8', chunksize=chunksize)):
+        # Validar colunas necessárias
+        columns = set(chunk.columns)
+        missing_columns = [col for col in TRANSACTION_COLUMNS if col not in columns]
+        
+        if missing_columns:
+            raise ValueError(f"Colunas faltando no CSV: {missing_columns}")
+        
+        if position == 0:
+            date_format = _detect_date_format(chunk['data'])
+        
+        yield _coerce_transactions(chunk, date_format)
+
+
+def _coerce_transactions(df: pd.DataFrame, date_format: str | None) -> pd.DataFrame:
+    """
+    Converte 'valor' e 'data' e remove as linhas em que a conversão falhou
+    
+    Args:
+        df: Transações como lidas do CSV
+        date_format: Formato das datas do arquivo (_detect_date_format) ou None
+    """
     df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
+    df['data'] = _parse_dates(df['data'], date_format)
+    
+    # Máscara booleana única; sem linhas inválidas o DataFrame é devolvido sem cópia
+    valid = df['valor'].notna().to_numpy() & df['data'].notna().to_numpy()
+    return df if valid.all() else df[valid]
+
+
+def _parse_dates(dates: pd.Series, date_format: str | None) -> pd.Series:
+    """
+    Converte a coluna de datas (NaT onde a conversão falha)
+    
+    Com um formato detectado (ver _detect_date_format) a conversão é vetorizada.
+    Se o formato não converte ao menos DATE_FORMAT_MIN_MATCH das datas preenchidas,
+    a coluna mistura formatos e é convertida inteira com format='mixed' (elemento a
+    elemento); abaixo desse limite, só as datas que falharam são reconvertidas.
+    Nas reconversões, datas com barra seguem a ordem do formato detectado (dia
+    antes do mês para %d/%m/%Y), para que a mesma data seja lida sempre igual.
+    
+    Args:
+        dates: Coluna 'data' como lida do CSV
+        date_format: Formato detectado para o arquivo, ou None para o pandas inferir
+        
+    Returns:
+        Série datetime64
+    """
+    if date_format is None:
+        return pd.to_datetime(dates, errors='coerce')
+    
+    parsed = pd.to_datetime(dates, format=date_format, errors='coerce')
+    failed = dates.notna().to_numpy() & parsed.isna().to_numpy()
+    if not failed.any():
+        return parsed
     
-    # Remover linhas com valores inválidos
-    df = df.dropna(subset=['valor', 'data'])
+    dayfirst = date_format == '%d/%m/%Y'
+    if failed.sum() > (1 - DATE_FORMAT_MIN_MATCH) * dates.notna().sum():
+        return _parse_mixed_dates(dates, dayfirst)
     
-    return df
+    parsed[failed] = _parse_mixed_dates(dates[failed], dayfirst)
+    return parsed
+
+
+def _parse_mixed_dates(dates: pd.Series, dayfirst: bool) -> pd.Series:
+    """
+    Converte datas em formatos variados (format='mixed')
+    
+    Datas ISO (aaaa-mm-dd) são convertidas antes, porque com dayfirst o pandas
+    também inverteria dia e mês nelas ("2008-03-04" viraria 3 de abril).
+    """
+    parsed = pd.to_datetime(dates, format='ISO8601', errors='coerce')
+    failed = dates.notna().to_numpy() & parsed.isna().to_numpy()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(dates[failed], format='mixed', dayfirst=dayfirst, errors='coerce')
+    return parsed
+
+
+def _detect_date_format(dates: pd.Series) -> str | None:
+    """
+    Detecta o formato das datas pela primeira amostra que casa com DATE_FORMATS
+    
+    Com o formato explícito a conversão é vetorizada mesmo quando a primeira
+    linha tem uma data inválida (caso em que a inferência do pandas desiste e
+    converte elemento a elemento). Datas com barra são tomadas como dd/mm/aaaa.
+    
+    Returns:
+        Formato para pd.to_datetime, ou None para deixar o pandas inferir
+    """
+    for value in dates.head(DATE_FORMAT_SAMPLE_SIZE):
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        for pattern, date_format in DATE_FORMATS:
+            if pattern.fullmatch(value):
+                return date_format
+    return None
+
+
+# Colunas de cada email retornado por load_emails
+EMAIL_COLUMNS = [
+    'remetente', 'destinatario', 'assunto', 'data', 'mensagem',
+    'de', 'para', '_de_lc', '_para_lc', '_searchtext', '_msg_lower'
+]
+
+# Linha separadora entre emails (começa com --- ou ===)
+SEP_RE = re.compile(r'^[^\S\n]*(?:---|===).*$', re.MULTILINE)
+
+# Linha de cabeçalho: nome do campo e o restante da linha
+HDR_RE = re.compile(
+    r'^[^\S\n]*(De|From|Para|To|Assunto|Subject|Data|Date|Mensagem|Message):(.*)$',
+    re.MULTILINE
+)
+
+# Cabeçalho -> campo do email (Mensagem/Message abrem o corpo e não estão aqui)
+FIELD_MAP = {
+    'De': 'remetente', 'From': 'remetente',
+    'Para': 'destinatario', 'To': 'destinatario',
+    'Assunto': 'assunto', 'Subject': 'assunto',
+    'Data': 'data', 'Date': 'data',
+}
 
 
 def load_emails(filepath: str | Path) -> List[Dict[str, str]]:
     """
     Carrega emails do arquivo de texto
     
+    O resultado do parse fica em um arquivo auxiliar em config.CACHE_DIR, invalidado
+    quando o arquivo de emails é modificado.
+    
     Args:
         filepath: Caminho para o arquivo de emails
         
@@ -79,7 +355,8 @@ def load_emails(filepath: str | Path) -> List[Dict[str, str]]:
                 'destinatario': 'email',  # também acessível como 'para'
                 'assunto': 'texto',
                 'data': 'data',
-                'mensagem': 'corpo do email'
+                'mensagem': 'corpo do email',
+                '_de_lc', '_para_lc', '_searchtext', '_msg_lower': campos em minúsculas para triagem
             }
         ]
     """
@@ -88,96 +365,53 @@ def load_emails(filepath: str | Path) -> List[Dict[str, str]]:
     if not filepath.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Separar emails (assumindo que são separados por linhas vazias ou delimitadores)
+    return _cached(filepath, 'emails', lambda: _parse_emails(filepath))
+
+
+def _parse_emails(filepath: Path) -> List[Dict[str, str]]:
+    """Lê e separa os emails do arquivo de texto"""
     emails = []
-    current_email = {
-        'remetente': '',
-        'destinatario': '',
-        'assunto': '',
-        'data': '',
-        'mensagem': ''
-    }
-    
-    lines = content.split('\n')
-    in_message = False
+    current_email = _empty_email()
     message_lines = []
+    # Linhas fora de cabeçalhos entram na mensagem depois do remetente
+    # ou logo após "Mensagem:"
+    in_message = False
     
-    for line in lines:
-        line_stripped = line.strip()
+    # Separar emails pelas linhas delimitadoras; um bloco sem remetente
+    # continua no bloco seguinte
+    for block in _iter_email_blocks(filepath):
+        position = 0
         
-        # Detectar novo email
-        if line_stripped.startswith('---') or line_stripped.startswith('==='):
-            # Salvar email anterior se existir
-            if current_email['remetente'] or current_email['mensagem']:
-                current_email['mensagem'] = '\n'.join(message_lines).strip()
-                
-                # Adicionar aliases para compatibilidade
-                email_with_aliases = current_email.copy()
-                email_with_aliases['de'] = current_email['remetente']
-                email_with_aliases['para'] = current_email['destinatario']
-                
-                emails.append(email_with_aliases)
-                
-                # Resetar para próximo email
-                current_email = {
-                    'remetente': '',
-                    'destinatario': '',
-                    'assunto': '',
-                    'data': '',
-                    'mensagem': ''
-                }
-                message_lines = []
-                in_message = False
-            continue
-        
-        # Parse de campos
-        if line_stripped.startswith('De:') or line_stripped.startswith('From:'):
-            current_email['remetente'] = line_stripped.split(':', 1)[1].strip()
-            in_message = False
+        for match in HDR_RE.finditer(block):
+            if in_message or current_email['remetente']:
+                _append_message_lines(message_lines, block[position:match.start()])
             
-        elif line_stripped.startswith('Para:') or line_stripped.startswith('To:'):
-            current_email['destinatario'] = line_stripped.split(':', 1)[1].strip()
-            in_message = False
-            
-        elif line_stripped.startswith('Assunto:') or line_stripped.startswith('Subject:'):
-            current_email['assunto'] = line_stripped.split(':', 1)[1].strip()
-            in_message = False
+            header, value = match.groups()
+            field = FIELD_MAP.get(header)
             
-        elif line_stripped.startswith('Data:') or line_stripped.startswith('Date:'):
-            current_email['data'] = line_stripped.split(':', 1)[1].strip()
-            in_message = False
-            
-        elif line_stripped.startswith('Mensagem:') or line_stripped.startswith('Message:'):
-            in_message = True
-            # Pegar texto após "Mensagem:" se houver
-            msg_text = line_stripped.split(':', 1)[1].strip()
-            if msg_text:
-                message_lines.append(msg_text)
-                
-        elif line_stripped == '':
-            # Linha vazia pode indicar início da mensagem
-            if current_email['remetente'] and not in_message:
+            if field is None:
                 in_message = True
-                
-        else:
-            # Adicionar linha à mensagem
-            if in_message or (current_email['remetente'] and not current_email['mensagem']):
-                message_lines.append(line)
-                in_message = True
-    
-    # Adicionar último email
-    if current_email['remetente'] or message_lines:
-        current_email['mensagem'] = '\n'.join(message_lines).strip()
+                # Pegar texto após "Mensagem:" se houver
+                if value.strip():
+                    message_lines.append(value.strip())
+            else:
+                current_email[field] = value.strip()
+                in_message = False
+            
+            position = match.end()
         
-        # Adicionar aliases
-        email_with_aliases = current_email.copy()
-        email_with_aliases['de'] = current_email['remetente']
-        email_with_aliases['para'] = current_email['destinatario']
+        if in_message or current_email['remetente']:
+            _append_message_lines(message_lines, block[position:])
         
-        emails.append(email_with_aliases)
+        if current_email['remetente']:
+            emails.append(_finish_email(current_email, message_lines))
+            current_email = _empty_email()
+            message_lines = []
+            in_message = False
+    
+    # Último bloco sem remetente, mas com mensagem
+    if message_lines:
+        emails.append(_finish_email(current_email, message_lines))
     
     # Filtrar emails vazios
     emails = [e for e in emails if e['mensagem'].strip()]
@@ -185,6 +419,108 @@ def load_emails(filepath: str | Path) -> List[Dict[str, str]]:
     return emails
 
 
+def _iter_email_blocks(filepath: Path) -> Iterator[str]:
+    """
+    Lê o arquivo linha a linha e entrega o texto entre linhas separadoras
+    
+    Só o bloco atual fica em memória, não o arquivo inteiro.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        block_lines = []
+        for line in f:
+            if SEP_RE.match(line):
+                yield ''.join(block_lines)
+                block_lines = []
+            else:
+                block_lines.append(line)
+        yield ''.join(block_lines)
+
+
+def _empty_email() -> Dict[str, str]:
+    return {
+        'remetente': '',
+        'destinatario': '',
+        'assunto': '',
+        'data': '',
+        'mensagem': ''
+    }
+
+
+def _append_message_lines(message_lines: List[str], text: str):
+    """Adiciona à mensagem as linhas não vazias de um trecho entre cabeçalhos"""
+    message_lines.extend(line for line in text.split('\n') if line.strip())
+
+
+def _finish_email(current_email: Dict[str, str], message_lines: List[str]) -> Dict[str, str]:
+    """Monta o corpo da mensagem e adiciona aliases e campos de busca"""
+    email = current_email.copy()
+    email['mensagem'] = '\n'.join(message_lines).strip()
+    
+    # Adicionar aliases para compatibilidade
+    email['de'] = email['remetente']
+    email['para'] = email['destinatario']
+    _add_search_fields(email)
+    
+    return email
+
+
+def load_emails_df(filepath: str | Path) -> pd.DataFrame:
+    """
+    Carrega emails em formato colunar (um DataFrame, uma coluna por campo)
+    
+    Args:
+        filepath: Caminho para o arquivo de emails
+        
+    Returns:
+        DataFrame com as colunas de load_emails; remetente/destinatario vazios
+        são preenchidos com 'Desconhecido'
+    """
+    emails_df = pd.DataFrame.from_records(load_emails(filepath), columns=EMAIL_COLUMNS)
+    
+    for column in ('remetente', 'destinatario', 'de', 'para'):
+        emails_df[column] = emails_df[column].replace('', 'Desconhecido')
+    
+    return emails_df
+
+
+def _add_search_fields(email: Dict[str, str]):
+    """
+    Pré-calcula versões em minúsculas dos campos usados nas triagens por palavra-chave,
+    evitando repetir .lower() a cada filtro
+    
+    Campos adicionados:
+        '_de_lc': endereço do remetente em minúsculas, sem o nome de exibição
+                  ("Nome <addr>" -> "addr"), para comparação por igualdade
+        '_para_lc': tupla com os endereços de todos os destinatários, no mesmo
+                    formato (campo "Para:" com vários endereços separados por ; ou ,)
+        '_searchtext': assunto + mensagem em minúsculas
+        '_msg_lower': mensagem em minúsculas
+    """
+    email['_de_lc'] = next(iter(_canonical_addresses(email['de'])), '')
+    email['_para_lc'] = _canonical_addresses(email['para'])
+    email['_msg_lower'] = email['mensagem'].lower()
+    email['_searchtext'] = email['assunto'].lower() + ' ' + email['_msg_lower']
+
+
+def _canonical_addresses(field: str) -> tuple:
+    """
+    Extrai os endereços de um campo "Nome <addr>; Nome <addr>" em minúsculas
+    
+    Returns:
+        Tupla de endereços, na ordem do campo; sem nenhum endereço com @
+        (ex: "Toda a equipe"), o campo inteiro; vazia para campo vazio
+    """
+    addresses = tuple(
+        address.strip().lower()
+        for _, address in getaddresses([field.replace(';', ',')])
+        if address.strip()
+    )
+    if any('@' in address for address in addresses):
+        return addresses
+    field = field.strip().lower()
+    return (field,) if field else ()
+
+
 def format_email_for_analysis(email: Dict[str, str]) -> str:
     """
     Formata um email para análise pelo LLM
@@ -290,6 +626,34 @@ def split_text_for_rag(text: str, chunk_size: int = 500, chunk_overlap: int = 50
     return chunks
 
 
+def load_policy_chunks(filepath: str | Path, chunk_size: int = 500,
+                       chunk_overlap: int = 50) -> List[str]:
+    """
+    Carrega a política de compliance já dividida em chunks para o RAG
+    
+    Os chunks ficam em um arquivo auxiliar em config.CACHE_DIR (um por combinação
+    de chunk_size/chunk_overlap), invalidado quando a política é modificada.
+    
+    Args:
+        filepath: Caminho para o arquivo da política
+        chunk_size: Tamanho aproximado de cada chunk em caracteres
+        chunk_overlap: Sobreposição entre chunks
+        
+    Returns:
+        Lista de chunks de texto (ver split_text_for_rag)
+    """
+    filepath = Path(filepath)
+    
+    if not filepath.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
+    
+    return _cached(
+        filepath,
+        f'chunks_{chunk_size}_{chunk_overlap}',
+        lambda: split_text_for_rag(load_compliance_policy(filepath), chunk_size, chunk_overlap)
+    )
+
+
 def load_and_validate_data(compliance_path: str | Path, 
                           transactions_path: str | Path, 
                           emails_path: str | Path) -> Dict:
@@ -0,0 +1,101 @@
+"""
+Embedder usado pelo RAG de compliance
+
+Por padrão usa o all-MiniLM-L6-v2 em ONNX que acompanha o ChromaDB (FP32).
+Se config.EMBEDDING_ONNX_PATH apontar para uma versão quantizada em int8
+(gerada por export_quantized_embedder), ela é carregada via sentence-transformers
+com backend ONNX, reduzindo o custo de CPU da indexação e das consultas.
+
+Uso (exportação única do modelo quantizado):
+    python -m utils.embeddings models/minilm-int8
+"""
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import config
+
+BASE_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Arquivo gerado por export_dynamic_quantized_onnx_model com a configuração avx512_vnni
+QUANTIZED_FILE_NAME = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+class QuantizedMiniLMEmbedding:
+    """
+    Embedder all-MiniLM-L6-v2 quantizado (int8) executado no ONNX Runtime
+    """
+
+    def __init__(self, model_path: str | Path, file_name: str = QUANTIZED_FILE_NAME):
+        import onnxruntime
+        from sentence_transformers import SentenceTransformer
+
+        # Metade dos núcleos para o ONNX Runtime, deixando CPU livre para o restante do processo
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+
+        self._model = SentenceTransformer(
+            str(model_path),
+            backend="onnx",
+            model_kwargs={"file_name": file_name, "session_options": session_options}
+        )
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        return list(self._model.encode(
+            list(input),
+            batch_size=64,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ))
+
+
+def get_embedder():
+    """
+    Retorna o embedder configurado
+
+    Returns:
+        Callable que recebe uma lista de textos e retorna uma lista de vetores normalizados
+    """
+    if config.EMBEDDING_ONNX_PATH:
+        return QuantizedMiniLMEmbedding(config.EMBEDDING_ONNX_PATH)
+
+    from chromadb.utils import embedding_functions
+    return embedding_functions.DefaultEmbeddingFunction()
+
+
+def get_embedder_id() -> str:
+    """
+    Identifica o embedder configurado (vetores de embedders diferentes não são comparáveis)
+
+    Returns:
+        String gravada nos metadados da coleção para detectar troca de embedder
+    """
+    if config.EMBEDDING_ONNX_PATH:
+        return f"{BASE_MODEL_NAME}-qint8:{Path(config.EMBEDDING_ONNX_PATH).name}"
+    return BASE_MODEL_NAME
+
+
+def export_quantized_embedder(output_dir: str | Path):
+    """
+    Exporta o all-MiniLM-L6-v2 para ONNX e gera a versão quantizada dinamicamente em int8
+
+    Args:
+        output_dir: Pasta de destino (usar depois em EMBEDDING_ONNX_PATH)
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    output_dir = Path(output_dir)
+    model = SentenceTransformer(f"sentence-transformers/{BASE_MODEL_NAME}", backend="onnx")
+    model.save_pretrained(str(output_dir))
+
+    # avx512_vnni usa as instruções de produto escalar int8 (VNNI) das CPUs Intel recentes
+    export_dynamic_quantized_onnx_model(model, "avx512_vnni", str(output_dir))
+
+    print(f"✓ Modelo quantizado salvo em: {output_dir / QUANTIZED_FILE_NAME}")
+    print(f"  Configure no .env: EMBEDDING_ONNX_PATH={output_dir}")
+
+
+if __name__ == "__main__":
+    export_quantized_embedder(sys.argv[1] if len(sys.argv) > 1 else "models/minilm-int8")
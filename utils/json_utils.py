@@ -0,0 +1,26 @@
+"""
+Utilitários para interpretar respostas JSON do LLM
+"""
+import re
+from typing import Any
+
+import orjson
+
+# Cercas de markdown (```json ... ```) no início/fim da resposta
+_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+
+def parse_llm_json(response: str) -> Any:
+    """
+    Parseia uma resposta JSON do LLM, removendo cercas de markdown se houver
+    
+    Args:
+        response: Texto retornado pelo LLM
+        
+    Returns:
+        Objeto JSON parseado
+        
+    Raises:
+        orjson.JSONDecodeError: Se a resposta não for JSON válido
+    """
+    return orjson.loads(_FENCE.sub('', response))
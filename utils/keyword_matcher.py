@@ -0,0 +1,62 @@
+"""
+Busca de várias palavras-chave em um texto de uma só vez
+
+Usa um autômato Aho-Corasick (pyahocorasick, opcional) que percorre o texto uma
+única vez independentemente do número de palavras-chave. Sem o pacote, usa uma
+alternação regex pré-compilada com o mesmo resultado.
+"""
+import re
+from typing import Iterable, Optional
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Verifica se um texto (já em minúsculas) contém alguma das palavras-chave
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = [keyword.lower() for keyword in keywords]
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            # Valor guardado: (posição na lista, palavra-chave) para resolver prioridade
+            for index, keyword in enumerate(self.keywords):
+                if keyword not in self._automaton:
+                    self._automaton.add_word(keyword, (index, keyword))
+            self._automaton.make_automaton()
+            self._pattern = None
+        else:
+            self._automaton = None
+            self._pattern = re.compile('|'.join(map(re.escape, self.keywords)))
+
+    def contains_any(self, text_lower: str) -> bool:
+        """
+        Args:
+            text_lower: Texto em minúsculas
+
+        Returns:
+            True se alguma palavra-chave aparece no texto
+        """
+        if self._automaton is not None:
+            return next(self._automaton.iter(text_lower), None) is not None
+        return self._pattern.search(text_lower) is not None
+
+    def first_match(self, text_lower: str) -> Optional[str]:
+        """
+        Args:
+            text_lower: Texto em minúsculas
+
+        Returns:
+            Palavra-chave presente no texto que vem primeiro na lista, ou None
+        """
+        if self._automaton is not None:
+            hits = [value for _, value in self._automaton.iter(text_lower)]
+            return min(hits)[1] if hits else None
+        if self._pattern.search(text_lower) is None:
+            return None
+        return next(keyword for keyword in self.keywords if keyword in text_lower)
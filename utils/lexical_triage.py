@@ -0,0 +1,91 @@
+"""
+Triagem lexical barata antes da análise por LLM
+
+Classificador TF-IDF + regressão logística que estima a probabilidade de um
+email ser benigno. Emails claramente benignos podem ser descartados sem chamar
+o LLM; apenas os casos ambíguos seguem para a análise completa (cascata).
+
+O modelo é treinado com rótulos gerados pelo próprio LLM (bootstrap) e salvo
+com pickle. Requer scikit-learn (opcional).
+"""
+import pickle
+from pathlib import Path
+from typing import List
+
+
+class LexicalTriage:
+    """
+    Wrapper de um Pipeline scikit-learn treinado com rótulo 1 = benigno
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    @classmethod
+    def load(cls, model_path: str | Path) -> "LexicalTriage":
+        """
+        Carrega um modelo salvo por train_lexical_triage
+
+        Args:
+            model_path: Caminho do arquivo .pkl
+
+        Returns:
+            Instância pronta para uso
+        """
+        model_path = Path(model_path)
+
+        if not model_path.exists():
+            raise FileNotFoundError(f"Modelo de triagem não encontrado: {model_path}")
+
+        with open(model_path, 'rb') as f:
+            return cls(pickle.load(f))
+
+    def benign_probability(self, texts: List[str]) -> List[float]:
+        """
+        Estima a probabilidade de cada texto ser benigno
+
+        Args:
+            texts: Textos dos emails (assunto + mensagem)
+
+        Returns:
+            Lista de probabilidades (0-1), na mesma ordem dos textos
+        """
+        if not texts:
+            return []
+        benign_column = list(self.pipeline.classes_).index(1)
+        return self.pipeline.predict_proba(texts)[:, benign_column].tolist()
+
+
+def train_lexical_triage(texts: List[str], benign_labels: List[int],
+                         output_path: str | Path) -> LexicalTriage:
+    """
+    Treina e salva o classificador de triagem
+
+    Args:
+        texts: Textos dos emails (assunto + mensagem)
+        benign_labels: 1 para benigno, 0 para suspeito (ex: rótulos do LLM)
+        output_path: Caminho do arquivo .pkl a ser gerado
+
+    Returns:
+        Triagem treinada
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    if len(set(benign_labels)) < 2:
+        raise ValueError("Rótulos precisam conter exemplos benignos e suspeitos")
+
+    pipeline = Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), max_features=20000, sublinear_tf=True)),
+        ("clf", LogisticRegression(max_iter=1000, class_weight="balanced"))
+    ])
+    pipeline.fit(texts, benign_labels)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        pickle.dump(pipeline, f)
+
+    print(f"✓ Modelo de triagem salvo em: {output_path} ({len(texts)} exemplos)")
+    return LexicalTriage(pipeline)
@@ -2,8 +2,13 @@
 Adaptador universal para diferentes provedores de LLM
 Suporta: Groq
 """
-from typing import Optional
+from typing import Optional, Dict, Iterator, List, Union
+import json
+import threading
+import time
 import config
+from utils.concurrency import ContextThreadPoolExecutor
+from utils.llm_cache import LLMCache
 
 
 class LLMAdapter:
@@ -16,19 +21,48 @@ class LLMAdapter:
         self.model = config.MODEL_NAME
         
         if self.provider == "groq":
+            import httpx
             from groq import Groq
-            self.client = Groq(api_key=config.GROQ_API_KEY)
+            
+            # Cliente HTTP de longa duração com pool de conexões keep-alive,
+            # dimensionado para as chamadas concorrentes dos agentes
+            limits = httpx.Limits(
+                max_connections=config.LLM_MAX_WORKERS * 2,
+                max_keepalive_connections=config.LLM_MAX_WORKERS * 2
+            )
+            try:
+                # HTTP/2 multiplexa as chamadas concorrentes em poucas conexões (requer h2)
+                self._http_client = httpx.Client(limits=limits, timeout=60.0, http2=config.LLM_HTTP2)
+            except ImportError:
+                print("⚠️  Pacote h2 não instalado (pip install 'httpx[http2]') - usando HTTP/1.1")
+                self._http_client = httpx.Client(limits=limits, timeout=60.0)
+            self.client = Groq(api_key=config.GROQ_API_KEY, http_client=self._http_client)
             
         else:
             raise ValueError(f"Provider não suportado: {self.provider}")
+        
+        # Cache de respostas em disco (desativável com --no-cache)
+        self.cache = LLMCache(
+            config.CACHE_DIR,
+            memory_size=config.LLM_MEMORY_CACHE_SIZE,
+            memory_ttl=config.LLM_MEMORY_CACHE_TTL
+        ) if config.LLM_CACHE_ENABLED else None
+        
+        # Limita as requisições em andamento no provider a config.LLM_MAX_WORKERS,
+        # somando todas as threads que compartilham o adaptador (ex: os agentes
+        # rodando em paralelo, cada um com o próprio pool de chamadas)
+        self._in_flight = threading.BoundedSemaphore(config.LLM_MAX_WORKERS)
     
     def generate(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
-    ) -> str:
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict] = None,
+        stream: bool = False,
+        model: Optional[str] = None
+    ) -> Union[str, Iterator[str]]:
         """
         Gera resposta do LLM de forma unificada
         
@@ -37,29 +71,311 @@ class LLMAdapter:
             user_prompt: Pergunta/prompt do usuário
             temperature: Temperatura (0-1), padrão do config
             max_tokens: Máximo de tokens, padrão do config
+            response_format: Formato estruturado de saída (ex: {"type": "json_object"})
+            stream: Se True, retorna um iterador que entrega a resposta em pedaços
+                    à medida que o modelo gera os tokens
+            model: Modelo a usar nesta chamada, padrão self.model
             
         Returns:
-            Resposta do LLM como string
+            Resposta do LLM como string (ou iterador de strings se stream=True)
         """
         temperature = temperature if temperature is not None else config.TEMPERATURE
         max_tokens = max_tokens if max_tokens is not None else config.MAX_TOKENS
+        model = model or self.model
         
-        if self.provider == "groq":
-            return self._generate_groq(system_prompt, user_prompt, temperature, max_tokens)
+        # Só cachear respostas (quase) determinísticas
+        cache_key = None
+        if self.cache is not None and temperature <= config.LLM_CACHE_MAX_TEMPERATURE:
+            cache_key = LLMCache.make_key(
+                model=model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=response_format
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return iter([cached]) if stream else cached
+        
+        if stream:
+            return self._stream(system_prompt, user_prompt, temperature, max_tokens,
+                                response_format, cache_key, model)
+        
+        with self._in_flight:
+            if self.provider == "groq":
+                response = self._generate_groq(system_prompt, user_prompt, temperature, max_tokens,
+                                               response_format, model)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, response)
+        
+        return response
+    
+    def _stream(self, system_prompt: str, user_prompt: str, temperature: float,
+                max_tokens: int, response_format: Optional[Dict],
+                cache_key: Optional[str], model: str) -> Iterator[str]:
+        """Entrega a resposta em pedaços e armazena o texto completo no cache ao final"""
+        parts = []
+        
+        # A vaga é liberada ao fim da resposta (ou quando o consumidor abandona o iterador)
+        with self._in_flight:
+            if self.provider == "groq":
+                chunks = self._stream_groq(system_prompt, user_prompt, temperature, max_tokens,
+                                           response_format, model)
+            
+            for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
+    
+    @staticmethod
+    def _extra_args(temperature: float, response_format: Optional[Dict]) -> Dict:
+        """
+        Parâmetros opcionais da chamada: response_format e, em baixa temperatura,
+        a seed fixa (config.LLM_SEED)
+        """
+        extra_args = {}
+        if response_format is not None:
+            extra_args["response_format"] = response_format
+        if config.LLM_SEED is not None and temperature <= config.LLM_CACHE_MAX_TEMPERATURE:
+            extra_args["seed"] = config.LLM_SEED
+        return extra_args
+    
+    def _stream_groq(self, system_prompt: str, user_prompt: str,
+                     temperature: float, max_tokens: int,
+                     response_format: Optional[Dict] = None,
+                     model: Optional[str] = None) -> Iterator[str]:
+        """Gera resposta usando Groq em modo streaming"""
+        extra_args = self._extra_args(temperature, response_format)
+        
+        stream = self.client.chat.completions.create(
+            model=model or self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **extra_args
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
     
     def _generate_groq(self, system_prompt: str, user_prompt: str, 
-                       temperature: float, max_tokens: int) -> str:
+                       temperature: float, max_tokens: int,
+                       response_format: Optional[Dict] = None,
+                       model: Optional[str] = None) -> str:
         """Gera resposta usando Groq"""
+        extra_args = self._extra_args(temperature, response_format)
+        
+        # System prompt primeiro: os agentes o mantêm como constante de módulo, então o
+        # prefixo é idêntico entre chamadas e o provider pode reaproveitá-lo (prompt caching)
         response = self.client.chat.completions.create(
-            model=self.model,
+            model=model or self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            **extra_args
         )
         return response.choices[0].message.content
     
+    def cheap_generate(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        Gera resposta com o modelo barato (config.CHEAP_MODEL_NAME), usado como
+        primeira etapa de triagem antes do modelo principal
+        
+        Args:
+            system_prompt: Instruções do sistema
+            user_prompt: Pergunta/prompt do usuário
+            **kwargs: Demais parâmetros de generate()
+            
+        Returns:
+            Resposta do modelo barato
+        """
+        return self.generate(system_prompt, user_prompt,
+                             model=config.CHEAP_MODEL_NAME or self.model, **kwargs)
+    
+    def generate_many(self, requests: List[Dict],
+                      max_workers: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Gera respostas para várias chamadas em paralelo
+        
+        As chamadas são limitadas por rede, então várias requisições ficam em
+        andamento ao mesmo tempo (threads sobre o cliente HTTP compartilhado).
+        Cada chamada passa por generate(), usando o cache normalmente.
+        
+        Args:
+            requests: Lista de dicts com os parâmetros de generate() (system_prompt,
+                      user_prompt e, opcionalmente, temperature, max_tokens etc.)
+            max_workers: Chamadas simultâneas, padrão config.LLM_MAX_WORKERS
+            
+        Returns:
+            Respostas na mesma ordem dos requests (None para as que falharam)
+        """
+        def run(request: Dict) -> Optional[str]:
+            try:
+                return self.generate(**request)
+            except Exception as e:
+                print(f"  ⚠️  Erro na chamada ao LLM: {str(e)[:80]}")
+                return None
+        
+        if len(requests) <= 1:
+            return [run(request) for request in requests]
+        
+        with ContextThreadPoolExecutor(max_workers=max_workers or config.LLM_MAX_WORKERS) as executor:
+            return list(executor.map(run, requests))
+    
+    def generate_batch_job(self, requests: List[Dict]) -> List[Optional[str]]:
+        """
+        Gera respostas para várias chamadas via Batch API do provider (assíncrona,
+        com desconto de custo). Bloqueia até o job terminar.
+        
+        Chamadas já presentes no cache não são enviadas ao job.
+        
+        Args:
+            requests: Lista de dicts com system_prompt, user_prompt e, opcionalmente,
+                      temperature, max_tokens e response_format
+            
+        Returns:
+            Respostas na mesma ordem dos requests (None para os que falharam)
+        """
+        results: List[Optional[str]] = [None] * len(requests)
+        pending = {}
+        
+        for i, request in enumerate(requests):
+            temperature = request.get('temperature')
+            max_tokens = request.get('max_tokens')
+            params = {
+                'model': self.model,
+                'system_prompt': request['system_prompt'],
+                'user_prompt': request['user_prompt'],
+                'temperature': temperature if temperature is not None else config.TEMPERATURE,
+                'max_tokens': max_tokens if max_tokens is not None else config.MAX_TOKENS,
+                'response_format': request.get('response_format')
+            }
+            
+            cache_key = None
+            if self.cache is not None and params['temperature'] <= config.LLM_CACHE_MAX_TEMPERATURE:
+                cache_key = LLMCache.make_key(**params)
+                results[i] = self.cache.get(cache_key)
+            
+            if results[i] is None:
+                pending[f"req-{i}"] = (i, params, cache_key)
+        
+        if not pending:
+            return results
+        
+        if self.provider == "groq":
+            responses = self._batch_job_groq({
+                custom_id: params for custom_id, (_, params, _) in pending.items()
+            })
+        
+        for custom_id, (i, _, cache_key) in pending.items():
+            results[i] = responses.get(custom_id)
+            if results[i] is not None and cache_key is not None:
+                self.cache.set(cache_key, results[i])
+        
+        return results
+    
+    def _batch_job_groq(self, requests: Dict[str, Dict]) -> Dict[str, str]:
+        """Executa um job na Batch API da Groq e retorna as respostas por custom_id"""
+        lines = []
+        for custom_id, params in requests.items():
+            body = {
+                "model": params['model'],
+                "messages": [
+                    {"role": "system", "content": params['system_prompt']},
+                    {"role": "user", "content": params['user_prompt']}
+                ],
+                "temperature": params['temperature'],
+                "max_tokens": params['max_tokens']
+            }
+            body.update(self._extra_args(params['temperature'], params['response_format']))
+            
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }, ensure_ascii=False))
+        
+        # Cada requisição ao provider ocupa uma vaga de self._in_flight; a espera
+        # entre as consultas de status não, para não travar as chamadas síncronas
+        with self._in_flight:
+            input_file = self.client.files.create(
+                file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=config.LLM_BATCH_COMPLETION_WINDOW
+            )
+        print(f"  📦 Batch job {batch.id} enviado ({len(requests)} chamadas)")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(config.LLM_BATCH_POLL_INTERVAL)
+            with self._in_flight:
+                batch = self.client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"  ⚠️  Batch job {batch.id} terminou com status: {batch.status}")
+            return {}
+        
+        responses = {}
+        with self._in_flight:
+            output = self.client.files.content(batch.output_file_id).text()
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                responses[item["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        
+        return responses
+    
+    def close(self):
+        """Fecha as conexões HTTP mantidas pelo adaptador"""
+        if self.provider == "groq":
+            self._http_client.close()
+    
     def __repr__(self):
-        return f"LLMAdapter(provider={self.provider}, model={self.model})"
\ No newline at end of file
+        return f"LLMAdapter(provider={self.provider}, model={self.model})"
+
+
+# Adaptador único do processo: todos os agentes compartilham o mesmo pool de conexões HTTP
+_instance: Optional[LLMAdapter] = None
+_instance_lock = threading.Lock()
+
+
+def get_adapter() -> LLMAdapter:
+    """
+    Retorna o adaptador compartilhado, criando-o na primeira chamada
+    
+    Returns:
+        Instância única de LLMAdapter (segura para uso entre threads)
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = LLMAdapter()
+        return _instance
+
+
+def close_adapter():
+    """Fecha as conexões do adaptador compartilhado, se ele foi criado"""
+    global _instance
+    with _instance_lock:
+        if _instance is not None:
+            _instance.close()
+            _instance = None
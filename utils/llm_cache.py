@@ -0,0 +1,100 @@
+"""
+Cache em disco para respostas do LLM
+
+Evita chamadas repetidas ao provider quando o mesmo prompt é reenviado
+(ex: reexecução dos agentes sobre o mesmo corpus de emails).
+
+Na frente do SQLite fica uma camada LRU em memória com TTL, que responde aos
+prompts repetidos dentro da mesma execução sem ir ao disco.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class LLMCache:
+    """
+    Cache chave-valor persistido em SQLite, seguro para uso entre threads
+    """
+
+    def __init__(self, cache_dir: str | Path, memory_size: int = 500, memory_ttl: float = 3600):
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Camada em memória: chave -> (instante de expiração, resposta), em ordem de uso
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._memory_size = memory_size
+        self._memory_ttl = memory_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(cache_dir / "llm_responses.sqlite"),
+            check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """
+        Gera chave determinística a partir dos parâmetros da chamada
+
+        Args:
+            **params: Modelo, prompts, temperatura etc.
+
+        Returns:
+            Hash hexadecimal (BLAKE2b) dos parâmetros
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna a resposta armazenada ou None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+        return row[0]
+
+    def set(self, key: str, response: str):
+        """Armazena uma resposta"""
+        with self._lock:
+            self._remember(key, response)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                (key, response)
+            )
+            self._conn.commit()
+
+    def _remember(self, key: str, response: str):
+        """Guarda a resposta na camada em memória (chamar com o lock adquirido)"""
+        if self._memory_size <= 0:
+            return
+        self._memory[key] = (time.monotonic() + self._memory_ttl, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Remove todas as respostas armazenadas"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
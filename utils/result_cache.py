@@ -0,0 +1,79 @@
+"""
+Cache em disco de resultados de análise por email
+
+Guarda a análise final de cada email por detector, para que reexecuções sobre
+o mesmo corpus pulem a chamada ao LLM e o parse do JSON.
+As entradas são invalidadas quando algum arquivo de origem é modificado.
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import orjson
+
+
+class ResultCache:
+    """
+    Cache chave-valor de análises (dicts JSON) persistido em SQLite, seguro entre threads
+    """
+
+    def __init__(self, cache_dir: str | Path, source_paths: Iterable[str | Path]):
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Data de modificação dos arquivos de origem entra em toda chave
+        self._fingerprint = "|".join(
+            f"{Path(path).name}:{Path(path).stat().st_mtime_ns}" for path in source_paths
+        )
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(cache_dir / "detector_results.sqlite"),
+            check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def make_key(self, namespace: str, *parts: str) -> str:
+        """
+        Gera chave determinística para um resultado
+
+        Args:
+            namespace: Identifica o detector e os modelos usados
+            *parts: Conteúdo analisado (ex: chamada ao LLM serializada e participantes do email)
+
+        Returns:
+            Hash hexadecimal (SHA-256)
+        """
+        digest = hashlib.sha256()
+        for part in (self._fingerprint, namespace, *parts):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna o resultado armazenado ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def set(self, key: str, result: Dict):
+        """Armazena um resultado"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)",
+                (key, orjson.dumps(result))
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove todos os resultados armazenados"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
@@ -0,0 +1,61 @@
+"""
+Cache semântico de respostas do chatbot de compliance
+
+Perguntas com a mesma intenção e redação diferente ("posso comprar X?" /
+"é permitido comprar X?") recebem a resposta já gerada para a pergunta
+anterior, sem nova chamada ao LLM. A comparação é por similaridade de cosseno
+entre os embeddings das perguntas (os mesmos usados na recuperação do RAG).
+"""
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Índice em memória (busca exata por produto interno) de perguntas já respondidas
+    """
+
+    def __init__(self, threshold: float, max_entries: int = 1000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._responses = []
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, vector: Sequence[float]) -> Optional[str]:
+        """
+        Args:
+            vector: Embedding da pergunta
+
+        Returns:
+            Resposta da pergunta mais parecida, se a similaridade passar do limiar; senão None
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            if self._vectors is None:
+                return None
+            similarities = self._vectors @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._responses[best]
+
+    def set(self, vector: Sequence[float], response: str):
+        """Armazena a resposta de uma pergunta (as mais antigas saem quando o cache enche)"""
+        row = self._normalize(vector)[np.newaxis, :]
+        with self._lock:
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._responses.append(response)
+
+            if len(self._responses) > self.max_entries:
+                self._vectors = self._vectors[-self.max_entries:]
+                self._responses = self._responses[-self.max_entries:]